@@ -0,0 +1,38 @@
+"""CourseSync clash-analysis engine, importable without Streamlit."""
+from .calendars import calendar_departments, department_calendar, generate_department_calendar_actual_timing
+from .catalog import CourseCatalog, course_catalog
+from .clashes import (
+    CrossDeptClashResult,
+    DepartmentClashResult,
+    generate_clash_report,
+    generate_cross_dept_clash_report,
+)
+from .export import EXPORT_FORMATS, EXPORT_SCHEMAS, clash_tables, export_archive, write_exports
+from .incremental import ClashState, build_clash_state, update_clash_state
+from .ingest import read_schedule
+from .instrument import JobCancelled, PipelineProfile, count, instrumented, profiled, progress, stage, tracking
+from .intervals import IntervalIndex, find_overlapping_pairs, find_overlapping_pairs_between
+from .occupancy import free_slot_overview
+from .optimize import OptimizationResult, optimize_schedule
+from .parallel import map_departments
+from .render import (
+    iter_clash_report_html,
+    iter_cross_report_html,
+    iter_diff_report_html,
+    render_report_bytes,
+    write_report,
+)
+from .rules import ClashRules, compile_rules, load_rules
+from .schedule import (
+    days_order,
+    day_lookup,
+    expand_meetings,
+    format_minutes,
+    normalize_schedule,
+    parse_meeting_patterns,
+)
+from .jobs import AnalysisJob, analyze_upload, analyze_upload_stages, job_pool, submit_job
+from .store import DEFAULT_STORE_PATH, TermDiff, diff_terms, list_terms, load_sections, open_store, save_term
+from .whatif import find_section_slots
+
+__version__ = "1.3"
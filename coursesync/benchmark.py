@@ -0,0 +1,93 @@
+"""Per-stage wall time and peak memory of the pipeline on synthetic schedules."""
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from . import __version__
+from .calendars import generate_department_calendar_actual_timing
+from .clashes import generate_clash_report, generate_cross_dept_clash_report
+from .render import iter_clash_report_html, iter_cross_report_html, render_report_bytes
+from .schedule import days_order, normalize_schedule
+from .synthetic import generate_schedule
+
+# --------------------------
+# Pipeline Stages
+# --------------------------
+# Each stage reads what earlier stages left in the shared context and stores its
+# own output under its name, mirroring what the app and the CLI run per upload.
+
+def render_reports(ctx):
+    return (render_report_bytes(iter_clash_report_html(ctx["generate_clash_report"])),
+            render_report_bytes(iter_cross_report_html(ctx["generate_cross_dept_clash_report"])))
+
+STAGES = [
+    ("normalize_schedule", lambda ctx: normalize_schedule(ctx["upload"])),
+    ("generate_clash_report", lambda ctx: generate_clash_report(ctx["normalize_schedule"])),
+    ("generate_cross_dept_clash_report", lambda ctx: generate_cross_dept_clash_report(ctx["normalize_schedule"])),
+    ("generate_department_calendar_actual_timing",
+     lambda ctx: generate_department_calendar_actual_timing(ctx["normalize_schedule"])),
+    ("render_reports", render_reports),
+]
+
+def measure(func, ctx, trace_memory=False):
+    # (result, seconds, peak bytes allocated while func ran or None)
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    try:
+        start = time.perf_counter()
+        result = func(ctx)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+# --------------------------
+# Benchmark Runner
+# --------------------------
+
+def benchmark_size(n_sections, seed=0, density=1.0, repeat=1):
+    # One row per stage. Wall time is the best of `repeat` untraced runs; peak
+    # memory comes from one extra run under tracemalloc, which slows code down.
+    upload = generate_schedule(n_sections, seed=seed, density=density)
+    timings = {}
+    for _ in range(max(repeat, 1)):
+        ctx = {"upload": upload}
+        for name, func in STAGES:
+            ctx[name], seconds, _ = measure(func, ctx)
+            timings[name] = min(timings.get(name, seconds), seconds)
+
+    ctx = {"upload": upload}
+    peaks = {}
+    for name, func in STAGES:
+        ctx[name], _, peaks[name] = measure(func, ctx, trace_memory=True)
+
+    day_masks = ctx["normalize_schedule"]['DayMask'].to_numpy()
+    meetings = int((day_masks[:, None] >> np.arange(len(days_order)) & 1).sum())
+    return [{
+        "stage": name,
+        "sections": n_sections,
+        "meetings": meetings,
+        "seconds": round(timings[name], 6),
+        "peak_mib": round(peaks[name] / 2**20, 3),
+    } for name, _ in STAGES]
+
+def run_benchmark(sizes, seed=0, density=1.0, repeat=1):
+    # Yields JSON-ready rows tagged with the version and machine, so results from
+    # different releases can be appended to one file and compared
+    run = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "density": density,
+    }
+    for n_sections in sizes:
+        for row in benchmark_size(n_sections, seed=seed, density=density, repeat=repeat):
+            yield {**run, **row}
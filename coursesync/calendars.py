@@ -0,0 +1,57 @@
+"""Department calendars laid out on actual meeting times."""
+import numpy as np
+import pandas as pd
+
+from .instrument import count, instrumented
+from .schedule import days_order, expand_meetings, format_minutes
+
+SEPARATOR = "<br>"
+
+def calendar_cells(meetings):
+    # Courses meeting in each (department, start, end, day) cell joined by <br> in
+    # upload order. Summing object strings concatenates them inside the groupby
+    # loop, so a trailing separator is added per row and trimmed once at the end.
+    labels = pd.Series(meetings['Course'].astype(object).to_numpy() + SEPARATOR, dtype=object)
+    keys = [meetings[col] for col in ('Department', 'StartMin', 'EndMin', 'Day')]
+    cells = labels.groupby(keys, observed=True).sum()
+    return cells.str[:-len(SEPARATOR)]
+
+def calendar_grids(meetings):
+    # {dept: DataFrame} with one row per exact start–end slot (sorted on minutes) and
+    # one column per weekday, built for every department in one grouped pivot
+    grid = calendar_cells(meetings).unstack('Day', fill_value="")
+    grid = grid.reindex(columns=range(len(days_order)), fill_value="")
+
+    departments = grid.index.get_level_values('Department')
+    starts = grid.index.get_level_values('StartMin').to_numpy()
+    ends = grid.index.get_level_values('EndMin').to_numpy()
+    clock = {m: format_minutes(m) for m in np.unique(np.concatenate([starts, ends])).tolist()}
+    slots = np.array([f"{clock[s]}–{clock[e]}" for s, e in zip(starts.tolist(), ends.tolist())], dtype=object)
+
+    # Rows are grouped by department already; slice each one's block out of the grid
+    values = grid.to_numpy(dtype=object)
+    codes = departments.codes
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    calendars = {}
+    for lo, hi in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(codes)]])):
+        if hi > lo:
+            calendars[departments[lo]] = pd.DataFrame(values[lo:hi], index=slots[lo:hi], columns=days_order,
+                                                    dtype=object)
+    return calendars
+
+def calendar_departments(sections):
+    # Departments that get a calendar, in the same order as the full build
+    codes = sections['Department'].cat.codes.to_numpy()
+    return list(sections['Department'].cat.categories[np.unique(codes[codes >= 0])])
+
+@instrumented("department_calendar")
+def department_calendar(sections, dept):
+    # Calendar of a single department, for views that only show one at a time
+    meetings = expand_meetings(sections[(sections['Department'] == dept).to_numpy()])
+    return calendar_grids(meetings).get(dept)
+
+@instrumented("department_calendars")
+def generate_department_calendar_actual_timing(sections):
+    calendars = calendar_grids(expand_meetings(sections[sections['Department'].notna().to_numpy()]))
+    count(departments=len(calendars))
+    return calendars
@@ -0,0 +1,56 @@
+"""Per-run catalog of the distinct courses in a schedule."""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# Course Catalog
+# --------------------------
+# A term has a few thousand distinct course strings against tens of thousands of
+# sections and meetings, so everything derived from the course string alone is
+# worked out once per distinct course. The course id is the Course column's
+# category code, which expand_meetings and row filters keep, so every stage looks
+# values up with `catalog.<field>[codes]`. Each array carries one extra trailing
+# entry for id -1 (a missing course), which NumPy's negative indexing lands on.
+
+DEPARTMENT_RE = re.compile(r'^([A-Z]+)')
+COURSE_LEVEL_RE = re.compile(r'\b(\d{3})[A-Z]?\b')
+
+def extract_course_level(course_str):
+    match = COURSE_LEVEL_RE.search(str(course_str))
+    return int(match.group(1)) if match else None
+
+@dataclass(frozen=True)
+class CourseCatalog:
+    courses: pd.Index            # distinct course strings; position = course id
+    department: np.ndarray       # subject prefix ("CS"), None when the course has none
+    level: np.ndarray            # int16 course number (480 for "CSEE 480S"), -1 when there is none
+    level_group: np.ndarray      # int16 level // 100, -1 when there is no level
+
+    def special(self, rules):
+        # bool per course id: one of the rules' special courses (CSEE 480S / 481S)
+        return np.append(self.courses.isin(list(rules.special_courses)), False)
+
+@lru_cache(maxsize=8)
+def _build_catalog(courses):
+    departments, levels = [], []
+    for course in courses:
+        match = DEPARTMENT_RE.match(course)
+        departments.append(match.group(1) if match else None)
+        level = extract_course_level(course)
+        levels.append(-1 if level is None else level)
+    level = np.array(levels + [-1], dtype='int16')
+    return CourseCatalog(
+        courses=pd.Index(courses, dtype=object),
+        department=np.array(departments + [None], dtype=object),
+        level=level,
+        level_group=np.where(level >= 0, level // 100, -1).astype('int16'),
+    )
+
+def course_catalog(courses):
+    # Catalog of a Course column's categories; cached, so stages of one run that ask
+    # for the same categories share one catalog
+    return _build_catalog(tuple(str(course) for course in courses))
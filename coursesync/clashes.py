@@ -0,0 +1,255 @@
+"""Department-wise and cross-department clash detection."""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .catalog import course_catalog
+from .instrument import count, instrumented, progress
+from .intervals import find_overlapping_pairs, find_overlapping_pairs_between
+from .occupancy import free_slot_overview
+from .parallel import map_departments
+from .render import iter_clash_report_html, iter_cross_report_html, write_report
+from .resources import resource_clash_pairs
+from .rules import load_rules
+from .schedule import DAY_NAMES, RESOURCE_COLUMNS, days_order, expand_meetings
+
+# --------------------------
+# Clash Report Generator
+# --------------------------
+
+@dataclass
+class DepartmentClashResult:
+    departments: list            # report order (CS, EE first)
+    clashes: pd.DataFrame        # one row per clashing pair, days joined into "Day(s)"
+    wednesday_4_5: list          # sections meeting in a blocked window (Wednesday 4–5 PM by default)
+    free_slots: dict             # dept -> day -> [(start_min, end_min)]
+    blocked_windows: list = field(default_factory=list)
+    availability: dict = field(default_factory=dict)  # dept -> bool (hour x day) overview grid
+    resources: dict = field(default_factory=dict)     # Instructor/Room/Cohort -> grouped double-bookings
+
+    @property
+    def counts(self):
+        counts = {
+            "non_acceptable": int((self.clashes["RowClass"] == "red-row").sum()),
+            "wednesday_4_5": len(self.wednesday_4_5),
+        }
+        for column, clashes in self.resources.items():
+            counts[f"{column.lower()}_conflicts"] = len(clashes)
+        return counts
+
+
+@dataclass
+class CrossDeptClashResult:
+    clashes: pd.DataFrame        # same-level pairs between rule departments, keyed by "DeptPair"
+    csee_clashes: list           # special course rule (CSEE 480S/481S against 300–400 levels)
+    department_pairs: list = field(default_factory=list)
+    special_key: str = "CSEE_480S_481S"
+    special_title: str = ""
+
+    @property
+    def counts(self):
+        counts = {self.special_key: len(self.csee_clashes)}
+        for pair in self.department_pairs:
+            counts[f"{pair[0]}-{pair[1]}"] = int((self.clashes["DeptPair"] == pair).sum())
+        return counts
+
+
+def clash_entries_frame(g, I, J, row_class="red-row", **keys):
+    # One entry per clashing (i, j) meeting pair; time and day are taken from meeting i
+    course = g['Course'].to_numpy()
+    section = g['Section #'].to_numpy()
+    return pd.DataFrame({
+        **keys,
+        "Course A": course[I], "Section A": section[I],
+        "Course B": course[J], "Section B": section[J],
+        "Time": g['Time'].to_numpy()[I],
+        "Day(s)": DAY_NAMES[g['Day'].to_numpy()[I]],
+        "RowClass": row_class,
+    })
+
+def overlapping_pair_arrays(g):
+    pairs = find_overlapping_pairs(g['Day'].tolist(), g['StartMin'].tolist(), g['EndMin'].tolist())
+    I, J = np.array(pairs, dtype=np.int64).reshape(-1, 2).T
+    level = g['Level'].to_numpy(dtype='int16', na_value=-1)
+    valid = (level[I] >= 0) & (level[J] >= 0)
+    return I[valid], J[valid], level
+
+# "Day(s)" label for every weekday bitmask, names sorted alphabetically as in the reports
+DAY_SET_LABELS = np.array([
+    ", ".join(sorted(name for d, name in enumerate(days_order) if mask >> d & 1))
+    for mask in range(1 << len(days_order))
+], dtype=object)
+DAY_BIT_BY_NAME = {name: 1 << d for d, name in enumerate(days_order)}
+
+def group_clash_days(df_clashes, key):
+    # One row per clashing section pair with its days joined; the days are OR-ed as a
+    # bitmask in a single groupby instead of a Python join per group
+    columns = [key, "Course A", "Section A", "Course B", "Section B", "Time", "RowClass"]
+    if df_clashes.empty:
+        return pd.DataFrame(columns=columns[:-1] + ["Day(s)", "RowClass"])
+    day_bits = df_clashes['Day(s)'].map(DAY_BIT_BY_NAME)
+    masks = (
+        df_clashes.assign(**{'Day(s)': day_bits})
+        .drop_duplicates(columns + ['Day(s)'])
+        .groupby(columns)['Day(s)'].sum()
+    )
+    return pd.Series(DAY_SET_LABELS[masks.to_numpy()], index=masks.index, name='Day(s)').reset_index()
+
+def blocked_window_entries(dept, g, rules):
+    # Detect blocked-window (Wednesday 4–5PM) restricted clashes
+    blocked_clashes = []
+    for day_code, start, end, label in rules.blocked_windows:
+        blocked_rows = g[(g['Day'] == day_code) & (g['StartMin'] < end) & (g['EndMin'] > start)]
+        for row in blocked_rows.to_dict('records'):
+            blocked_clashes.append({
+                "Department": dept,
+                "Course": row['Course'],
+                "Section": row['Section #'],
+                "Time": row['Time'],
+                "Day": days_order[day_code],
+                "Window": label,
+            })
+    return blocked_clashes
+
+def resource_clash_report(meetings):
+    # Grouped double-bookings for every resource column present in the upload; these
+    # cross department lines, so they are found over all meetings at once
+    report = {}
+    for column in RESOURCE_COLUMNS:
+        if column in meetings.columns:
+            I, J, keys = resource_clash_pairs(meetings, column)
+            report[column] = group_clash_days(clash_entries_frame(meetings, I, J, **{column: keys}), column)
+    return report
+
+def report_departments(sections):
+    return sorted(
+        sections['Department'].cat.categories,
+        key=lambda x: (x not in ["CS", "EE"], x)
+    )
+
+def analyze_department(dept, g, rules):
+    # Everything the department-wise report needs from one department's meetings.
+    # Module-level so it can run in a worker process (see parallel.map_departments).
+    blocked_clashes = blocked_window_entries(dept, g, rules)
+
+    # Detect clashes; red/green is one lookup in the compiled level-pair matrix
+    I, J, level = overlapping_pair_arrays(g)
+    level_matrix = rules.level_pair_matrix[rules.department_index.get(dept, -1)]
+    red = level_matrix[level[I] // 100, level[J] // 100]
+    clashes = clash_entries_frame(g, I, J, row_class=np.where(red, "red-row", "green-row"), Department=dept)
+
+    return blocked_clashes, clashes
+
+@instrumented("generate_clash_report")
+def generate_clash_report(sections, output_path=None, rules=None, workers=None):
+    rules = rules or load_rules()
+    wednesday_4_5_clashes = []
+    clash_frames = []
+
+    # Departments are independent; with workers > 1 they fan out to a process pool
+    # and come back in category order, so the merged result is deterministic
+    for dept, (blocked, clashes) in map_departments(sections, analyze_department, rules, workers=workers):
+        wednesday_4_5_clashes.extend(blocked)
+        clash_frames.append(clashes)
+
+    # Free slots and the hourly overview come from one occupancy bitmap over all departments
+    meetings = expand_meetings(sections)
+    free_slots_by_dept, availability = free_slot_overview(meetings, rules.blocked_windows)
+
+    df_clashes = pd.concat(clash_frames, ignore_index=True) if clash_frames else pd.DataFrame()
+    grouped = group_clash_days(df_clashes, "Department")
+    resources = resource_clash_report(meetings)
+    count(meetings=len(meetings), candidate_pairs=len(df_clashes),
+          clashes=len(grouped) + sum(len(clashes) for clashes in resources.values()))
+
+    all_departments = report_departments(sections)
+
+    result = DepartmentClashResult(
+        departments=all_departments,
+        clashes=grouped,
+        wednesday_4_5=wednesday_4_5_clashes,
+        free_slots={dept: free_slots_by_dept.get(dept, {}) for dept in all_departments},
+        availability=availability,
+        blocked_windows=[(days_order[d], start, end, label) for d, start, end, label in rules.blocked_windows],
+        resources=resources,
+    )
+    if output_path:
+        write_report(iter_clash_report_html(result), output_path)
+    return result
+
+
+def join_partitions(g, idx, left, right):
+    # Overlapping pairs between the two sides of a candidate partition, as global row numbers
+    idx = np.sort(idx)
+    pairs = find_overlapping_pairs_between(
+        g['Day'].to_numpy()[idx].tolist(),
+        g['StartMin'].to_numpy()[idx].tolist(),
+        g['EndMin'].to_numpy()[idx].tolist(),
+        left[idx].tolist(),
+        right[idx].tolist(),
+    )
+    return idx[np.array(pairs, dtype=np.int64).reshape(-1, 2)]
+
+@instrumented("generate_cross_dept_clash_report")
+def generate_cross_dept_clash_report(sections, output_path=None, rules=None):
+    rules = rules or load_rules()
+    g = expand_meetings(sections)
+
+    level = g['Level'].to_numpy(dtype='int16', na_value=-1)
+    level_group = np.where(level >= 0, level // 100, -1)
+    categories = list(g['Department'].cat.categories)
+    dept_idx = np.array([rules.cross_department_index.get(d, -1) for d in categories] + [-1])[g['Department'].cat.codes.to_numpy()]
+
+    # 🔴 Special rule: CSEE 480S or 481S cannot clash with any 300/400-level course.
+    # Only special-course meetings are joined against in-range meetings.
+    is_special = course_catalog(g['Course'].cat.categories).special(rules)[g['Course'].cat.codes.to_numpy()] & (level >= 0)
+    in_range = (level >= rules.special_min_level) & (level <= rules.special_max_level)
+    special_pairs = join_partitions(g, np.flatnonzero(is_special | in_range), is_special, in_range)
+    special_csee_clashes = clash_entries_frame(g, special_pairs[:, 0], special_pairs[:, 1]).to_dict('records')
+
+    # 🔴 Rule department pairs (CS/EE/CPE) at the same level group (300–700).
+    # Meetings are partitioned by (department, level group) and only the partitions a
+    # rule pairs up are joined; the sweep itself separates the days.
+    candidate = (dept_idx >= 0) & (level_group >= 0)
+    candidate[candidate] = rules.cross_level_groups[level_group[candidate]]
+    rows = np.flatnonzero(candidate)
+    partitions = pd.Series(rows).groupby([dept_idx[rows], level_group[rows]]).indices
+    cross_pairs, pair_no = [], []
+    for k, (a, b) in enumerate(rules.cross_pairs):
+        ia, ib = rules.cross_department_index[a], rules.cross_department_index[b]
+        for group in np.flatnonzero(rules.cross_level_groups):
+            if (ia, group) not in partitions or (ib, group) not in partitions:
+                continue
+            idx = rows[np.concatenate([partitions[(ia, group)], partitions[(ib, group)]])]
+            pairs = join_partitions(g, idx, dept_idx == ia, dept_idx == ib)
+            cross_pairs.append(pairs)
+            pair_no.append(np.full(len(pairs), k))
+        progress(k + 1, len(rules.cross_pairs))
+    cross_pairs = np.concatenate(cross_pairs) if cross_pairs else np.empty((0, 2), dtype=np.int64)
+    pair_no = np.concatenate(pair_no) if pair_no else np.empty(0, dtype=np.int64)
+
+    count(meetings=len(g), candidate_pairs=len(special_pairs) + len(cross_pairs))
+
+    # A pair caught by the special rule is only reported there
+    special_set = set(map(tuple, special_pairs.tolist()))
+    keep = np.array([pair not in special_set for pair in map(tuple, cross_pairs.tolist())], dtype=bool)
+    cross_pairs, pair_no = cross_pairs[keep], pair_no[keep]
+
+    pair_labels = np.empty(len(rules.cross_pairs), dtype=object)
+    pair_labels[:] = rules.cross_pairs
+    clash_entries = clash_entries_frame(g, cross_pairs[:, 0], cross_pairs[:, 1], DeptPair=pair_labels[pair_no])
+
+    grouped = group_clash_days(clash_entries, "DeptPair")
+    count(clashes=len(grouped) + len(special_csee_clashes))
+
+    result = CrossDeptClashResult(
+        clashes=grouped,
+        csee_clashes=special_csee_clashes,
+        department_pairs=list(rules.cross_pairs),
+        special_key=rules.special_key,
+        special_title=rules.special_title,
+    )
+    if output_path:
+        write_report(iter_cross_report_html(result), output_path)
+    return result
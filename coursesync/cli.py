@@ -0,0 +1,201 @@
+"""Headless entry point: ``coursesync analyze term.xlsx --out reports/``."""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from itertools import repeat
+
+from .clashes import generate_clash_report, generate_cross_dept_clash_report
+from .export import EXPORT_FORMATS, clash_tables, write_exports
+from .ingest import read_schedule
+from .instrument import profiled
+from .optimize import optimize_schedule
+from .parallel import resolve_workers
+from .render import iter_clash_report_html, iter_cross_report_html, iter_diff_report_html, write_report
+from .rules import DEFAULT_RULES_PATH, load_rules
+from .schedule import normalize_schedule
+from .store import DEFAULT_STORE_PATH, diff_terms, list_terms, open_store, save_term
+
+
+def analyze_term(path, out_dir, rules, workers=None, profile=False, trace_memory=False, cache_dir=None, store=None,
+                 export=None):
+    # Full pipeline for one export; reports go to <out_dir>/<file stem>/. With
+    # profile=True the summary also carries the per-stage records under "profile";
+    # with a store path the term is saved there under the file stem; export lists
+    # the data formats (jsonl, csv, parquet) to write next to the reports.
+    with profiled(trace_memory=trace_memory, source=path) as run:
+        sections = normalize_schedule(read_schedule(path, cache_dir=cache_dir))
+        clash_result = generate_clash_report(sections, rules=rules, workers=workers)
+        cross_result = generate_cross_dept_clash_report(sections, rules=rules)
+
+        term = os.path.splitext(os.path.basename(path))[0]
+        term_dir = os.path.join(out_dir, term)
+        write_report(iter_clash_report_html(clash_result), os.path.join(term_dir, "clash_report.html"))
+        write_report(iter_cross_report_html(cross_result), os.path.join(term_dir, "cross_report.html"))
+        if export:
+            write_exports(clash_tables(clash_result, cross_result), term_dir, export)
+        if store:
+            with closing(open_store(store)) as connection:
+                save_term(connection, term, sections, clash_result, cross_result, source=path)
+    summary = {"file": path, "reports": term_dir, **clash_result.counts, **cross_result.counts}
+    if profile:
+        summary["profile"] = run.records()
+    return summary
+
+
+def _analyze_term_job(path, out_dir, rules_path, profile, trace_memory, cache_dir, store, export):
+    # Batch-mode worker: load rules in the worker and report errors as values so one
+    # bad export doesn't abort the others
+    try:
+        return analyze_term(path, out_dir, load_rules(rules_path), profile=profile,
+                            trace_memory=trace_memory, cache_dir=cache_dir, store=store, export=export), None
+    except Exception as e:
+        return None, e
+
+
+def analyze_terms(paths, out_dir, rules_path, jobs=None, profile=False, trace_memory=False, cache_dir=None,
+                  store=None, export=None):
+    # Yields (path, summary, error) in input order. Several files fan out one per
+    # process; a single file fans its departments out instead.
+    jobs = resolve_workers(jobs)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            results = pool.map(_analyze_term_job, paths, repeat(out_dir), repeat(rules_path),
+                               repeat(profile), repeat(trace_memory), repeat(cache_dir), repeat(store),
+                               repeat(export))
+            for path, (summary, error) in zip(paths, results):
+                yield path, summary, error
+        return
+
+    rules = load_rules(rules_path)
+    for path in paths:
+        try:
+            yield path, analyze_term(path, out_dir, rules, workers=jobs, profile=profile,
+                                     trace_memory=trace_memory, cache_dir=cache_dir, store=store,
+                                     export=export), None
+        except Exception as e:
+            yield path, None, e
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="coursesync", description="Course schedule clash analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="write clash reports for one or more term exports")
+    analyze.add_argument("files", nargs="+", help="Excel (.xlsx), CSV, Feather or Parquet schedule exports")
+    analyze.add_argument("--out", default="reports", help="output directory (default: reports)")
+    analyze.add_argument("--rules", default=DEFAULT_RULES_PATH, help="clash rules file (JSON or YAML)")
+    analyze.add_argument("--json", action="store_true", help="print one JSON summary line per file")
+    analyze.add_argument("--jobs", type=int, default=1,
+                         help="worker processes for files (or departments of a single file); 0 = all cores")
+    analyze.add_argument("--profile", metavar="PATH",
+                         help="append per-stage timings and counters as JSON lines to PATH")
+    analyze.add_argument("--trace-memory", action="store_true",
+                         help="also record tracemalloc peak memory per stage (slower)")
+    analyze.add_argument("--cache", metavar="DIR",
+                         help="keep a Feather copy of each export in DIR for fast re-runs (needs pyarrow)")
+    analyze.add_argument("--store", metavar="DB",
+                         help="also save each term (named after its file) to this SQLite store")
+    analyze.add_argument("--export", nargs="+", choices=EXPORT_FORMATS, metavar="FORMAT",
+                         help="also write clashes, blocked-window and free-slot tables as jsonl, csv and/or "
+                              "parquet (parquet needs pyarrow)")
+
+    optimize = commands.add_parser("optimize", help="suggest section moves that clear red clashes")
+    optimize.add_argument("file", help="Excel (.xlsx), CSV, Feather or Parquet schedule export")
+    optimize.add_argument("--out", default="moves.csv", help="CSV of suggested moves (default: moves.csv)")
+    optimize.add_argument("--rules", default=DEFAULT_RULES_PATH, help="clash rules file (JSON or YAML)")
+    optimize.add_argument("--iterations", type=int, default=20000, help="annealing steps (default: 20000)")
+    optimize.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    optimize.add_argument("--move-penalty", type=float, default=0.5,
+                          help="cost of moving one section, in red clashes (default: 0.5)")
+    optimize.add_argument("--cache", metavar="DIR",
+                          help="keep a Feather copy of the export in DIR for fast re-runs (needs pyarrow)")
+
+    diff = commands.add_parser("diff", help="compare the clashes of two terms saved with analyze --store")
+    diff.add_argument("old", help="earlier term or draft, e.g. fall2025")
+    diff.add_argument("new", help="later term or draft, e.g. fall2025_v2")
+    diff.add_argument("--store", default=DEFAULT_STORE_PATH, help=f"SQLite store (default: {DEFAULT_STORE_PATH})")
+    diff.add_argument("--out", default="diff_report.html", help="HTML diff report (default: diff_report.html)")
+
+    bench = commands.add_parser("bench", help="time each pipeline stage on synthetic schedules")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                       help="section counts to generate (default: 100 1000 10000)")
+    bench.add_argument("--seed", type=int, default=0, help="generator seed (default: 0)")
+    bench.add_argument("--density", type=float, default=1.0,
+                       help="sections per department relative to a typical term (default: 1.0)")
+    bench.add_argument("--repeat", type=int, default=3, help="timed runs per size, best is kept (default: 3)")
+    bench.add_argument("--out", help="append results as JSON lines to this file")
+    return parser
+
+
+def bench_pipeline(args):
+    from .benchmark import run_benchmark
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else None
+    try:
+        print(f"{'sections':>9} {'stage':<44} {'seconds':>9} {'peak MiB':>9}")
+        for row in run_benchmark(args.sizes, seed=args.seed, density=args.density, repeat=args.repeat):
+            print(f"{row['sections']:>9} {row['stage']:<44} {row['seconds']:>9.3f} {row['peak_mib']:>9.1f}")
+            if out:
+                out.write(json.dumps(row) + "\n")
+                out.flush()
+    finally:
+        if out:
+            out.close()
+    return 0
+
+
+def diff_stored_terms(args):
+    with closing(open_store(args.store)) as connection:
+        try:
+            diff = diff_terms(connection, args.old, args.new)
+        except KeyError as e:
+            stored = ", ".join(list_terms(connection)['term']) or "none"
+            print(f"{e.args[0]} (stored: {stored})", file=sys.stderr)
+            return 1
+    write_report(iter_diff_report_html(diff), args.out)
+    counts = ", ".join(f"{k}={v}" for k, v in diff.counts.items())
+    print(f"{args.old} -> {args.new}: {counts} -> {args.out}")
+    return 0
+
+
+def optimize_term(args):
+    sections = normalize_schedule(read_schedule(args.file, cache_dir=args.cache))
+    result = optimize_schedule(sections, rules=load_rules(args.rules), iterations=args.iterations,
+                               seed=args.seed, move_penalty=args.move_penalty)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    result.moves.to_csv(args.out, index=False)
+    counts = ", ".join(f"{k}={v}" for k, v in result.counts.items())
+    print(f"{args.file}: {counts} -> {args.out}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "optimize":
+        return optimize_term(args)
+    if args.command == "bench":
+        return bench_pipeline(args)
+    if args.command == "diff":
+        return diff_stored_terms(args)
+
+    failed = 0
+    results = analyze_terms(args.files, args.out, args.rules, jobs=args.jobs,
+                            profile=bool(args.profile), trace_memory=args.trace_memory, cache_dir=args.cache,
+                            store=args.store, export=args.export)
+    for path, summary, error in results:
+        if error is not None:
+            print(f"{path}: error: {error}", file=sys.stderr)
+            failed += 1
+            continue
+        if args.profile:
+            with open(args.profile, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record) + "\n" for record in summary.pop("profile"))
+        if args.json:
+            print(json.dumps(summary))
+        else:
+            counts = ", ".join(f"{k}={v}" for k, v in summary.items() if k not in ("file", "reports"))
+            print(f"{path}: {counts} -> {summary['reports']}")
+    return 1 if failed else 0
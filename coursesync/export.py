@@ -0,0 +1,156 @@
+"""Machine-readable clash exports (JSON lines, CSV, Parquet) with a fixed schema."""
+import io
+import json
+import os
+import zipfile
+
+import pandas as pd
+
+from .instrument import count, instrumented
+from .occupancy import FREE_SLOT_HOURS
+from .render import slot_status
+from .schedule import days_order, format_minutes
+
+# --------------------------
+# Export Schema
+# --------------------------
+# Three tables, always with these columns in this order and these dtypes (empty
+# tables included), so downstream tools can rely on them. Bump EXPORT_VERSION
+# whenever a column is added, renamed or retyped.
+
+EXPORT_VERSION = 1
+EXPORT_FORMATS = ["jsonl", "csv", "parquet"]
+
+EXPORT_SCHEMAS = {
+    # Every reported pair: department-wise (red/green), resource double-bookings,
+    # cross-department and special-course clashes
+    "clashes": {
+        "clash_key": "string", "kind": "string", "scope": "string", "severity": "string",
+        "course_a": "string", "section_a": "string", "course_b": "string", "section_b": "string",
+        "days": "string", "time": "string",
+    },
+    # Sections meeting in a blocked window (Wednesday 4–5 PM by default)
+    "blocked_windows": {
+        "department": "string", "window": "string", "course": "string", "section": "string",
+        "day": "string", "time": "string",
+    },
+    # The hourly free-slot overview of the department-wise report
+    "free_slots": {
+        "department": "string", "day": "string", "start_min": "int16", "end_min": "int16",
+        "time": "string", "status": "string",
+    },
+}
+
+# --------------------------
+# Clash Rows
+# --------------------------
+# Flattened clashes shared by the exports and the term store (store.py). Every
+# clash carries a clash_key that names it independently of upload order.
+
+CLASH_COLUMNS = ['kind', 'scope', 'severity', 'course_a', 'section_a', 'course_b', 'section_b', 'days', 'time']
+
+def text(value):
+    return None if pd.isna(value) else str(value)
+
+def clash_key(kind, scope, severity, *members):
+    # Pairs are keyed in sorted order, so a reordered upload keys the same clash the same way
+    return "|".join([kind, scope, severity] + sorted(f"{course} {section}" for course, section in members))
+
+def pair_rows(kind, frame, scope_column, severity=None):
+    for row in frame.to_dict('records'):
+        scope = row[scope_column] if isinstance(row[scope_column], str) else "-".join(row[scope_column])
+        level = severity or ("red" if row['RowClass'] == "red-row" else "green")
+        a = (text(row['Course A']), text(row['Section A']))
+        b = (text(row['Course B']), text(row['Section B']))
+        yield (clash_key(kind, scope, level, a, b), kind, scope, level, *a, *b, row['Day(s)'], text(row['Time']))
+
+def clash_rows(clash_result, cross_result):
+    # Every clash the two reports show, flattened to CLASH_COLUMNS with a clash_key
+    yield from pair_rows("department", clash_result.clashes, "Department")
+    for entry in clash_result.wednesday_4_5:
+        scope = f"{entry['Department']} {entry['Window']}"
+        a = (text(entry['Course']), text(entry['Section']))
+        yield (clash_key("blocked", scope, "red", a) + f"|{entry['Day']}", "blocked", scope, "red",
+               *a, None, None, entry['Day'], text(entry['Time']))
+    for column, clashes in clash_result.resources.items():
+        yield from pair_rows(column.lower(), clashes, column, severity="red")
+    yield from pair_rows("cross", cross_result.clashes, "DeptPair", severity="red")
+    special = pd.DataFrame(cross_result.csee_clashes, columns=["Course A", "Section A", "Course B", "Section B", "Time", "Day(s)"])
+    yield from pair_rows("special", special.assign(Scope=cross_result.special_key), "Scope", severity="red")
+
+# --------------------------
+# Export Tables
+# --------------------------
+
+def schema_frame(rows, name):
+    schema = EXPORT_SCHEMAS[name]
+    return pd.DataFrame(list(rows), columns=list(schema)).astype(schema)
+
+def free_slot_rows(clash_result):
+    locked = {(day, start, end) for day, start, end, _ in clash_result.blocked_windows}
+    for dept in clash_result.departments:
+        availability = clash_result.availability.get(dept)
+        for d, day in enumerate(days_order):
+            for h, s in enumerate(FREE_SLOT_HOURS):
+                yield (dept, day, s, s + 60, f"{format_minutes(s)}–{format_minutes(s + 60)}",
+                       slot_status(availability, locked, h, d))
+
+def clash_tables(clash_result, cross_result):
+    # name -> DataFrame for each table of EXPORT_SCHEMAS
+    # Blocked-window entries get their own table, with the department and window split out
+    clashes = (row for row in clash_rows(clash_result, cross_result) if row[1] != "blocked")
+    blocked = (
+        (entry['Department'], entry['Window'], text(entry['Course']), text(entry['Section']), entry['Day'], text(entry['Time']))
+        for entry in clash_result.wednesday_4_5
+    )
+    return {
+        "clashes": schema_frame(clashes, "clashes"),
+        "blocked_windows": schema_frame(blocked, "blocked_windows"),
+        "free_slots": schema_frame(free_slot_rows(clash_result), "free_slots"),
+    }
+
+def schema_json():
+    return json.dumps({"version": EXPORT_VERSION, "tables": EXPORT_SCHEMAS}, indent=2) + "\n"
+
+def table_bytes(df, fmt):
+    # Parquet needs pyarrow (pip install .[cache])
+    if fmt == "jsonl":
+        return df.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt == "parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+def export_files(tables, formats):
+    # (file name, bytes) for every table in every format, plus schema.json
+    yield "schema.json", schema_json().encode("utf-8")
+    for name, df in tables.items():
+        for fmt in formats:
+            yield f"{name}.{fmt}", table_bytes(df, fmt)
+
+@instrumented("export_tables")
+def write_exports(tables, out_dir, formats=EXPORT_FORMATS):
+    # Writes <out_dir>/<table>.<format> and schema.json; returns the paths written
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for file_name, data in export_files(tables, formats):
+        path = os.path.join(out_dir, file_name)
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    count(rows=sum(len(df) for df in tables.values()), files=len(paths))
+    return paths
+
+@instrumented("export_tables")
+def export_archive(tables, formats=("jsonl", "csv")):
+    # In-memory zip of the same files, for st.download_button
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for file_name, data in export_files(tables, formats):
+            archive.writestr(file_name, data)
+    data = buffer.getvalue()
+    count(rows=sum(len(df) for df in tables.values()), bytes=len(data))
+    return data
@@ -0,0 +1,209 @@
+"""Incremental department-wise re-analysis after a schedule edit."""
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .catalog import course_catalog
+from .clashes import (
+    DepartmentClashResult,
+    blocked_window_entries,
+    generate_clash_report,
+    group_clash_days,
+    report_departments,
+    resource_clash_report,
+)
+from .instrument import count, instrumented, progress, stage
+from .intervals import IntervalIndex
+from .occupancy import free_slot_overview
+from .rules import load_rules
+from .schedule import days_order, expand_meetings
+
+# --------------------------
+# Incremental Clash State
+# --------------------------
+# Sections are matched between uploads by (Course, Section #, occurrence), where the
+# occurrence number tells repeated rows for the same section apart. Only sections that
+# were added, removed or changed touch the interval index, and only their departments
+# have their report sections rebuilt; everything else is carried over. Clashing pairs
+# are not stored: a rebuilt department sweeps its own buckets of the interval index.
+
+# special: the course is one of the rules' special courses, looked up in the course catalog
+SectionRecord = namedtuple("SectionRecord", "course section dept day_mask start end time level special")
+
+@dataclass
+class ClashState:
+    rules: object
+    ids: dict = field(default_factory=dict)          # section key -> section id
+    records: dict = field(default_factory=dict)      # section id -> SectionRecord
+    positions: dict = field(default_factory=dict)    # section id -> row in the latest upload
+    members: dict = field(default_factory=dict)      # dept -> {section id}
+    index: IntervalIndex = field(default_factory=IntervalIndex)
+    blocked: dict = field(default_factory=dict)      # dept -> blocked-window entries
+    clashes: dict = field(default_factory=dict)      # dept -> grouped clash frame
+    free_slots: dict = field(default_factory=dict)
+    availability: dict = field(default_factory=dict)
+    result: DepartmentClashResult = None
+    next_id: int = 0
+
+def section_records(sections, rules):
+    # (key, SectionRecord) for every section the department-wise report covers
+    sections = sections[sections['Department'].notna().to_numpy()]
+    special = course_catalog(sections['Course'].cat.categories).special(rules)
+    occurrence = sections.groupby(['Course', 'Section #'], observed=True, dropna=False).cumcount()
+    section_no = [None if pd.isna(v) else v for v in sections['Section #'].tolist()]
+    keys = zip(sections['Course'].tolist(), section_no, occurrence.tolist())
+    records = map(SectionRecord._make, zip(
+        sections['Course'].tolist(),
+        section_no,
+        sections['Department'].tolist(),
+        sections['DayMask'].tolist(),
+        sections['StartMin'].tolist(),
+        sections['EndMin'].tolist(),
+        sections['Time'].tolist(),
+        sections['Level'].to_numpy(dtype='int16', na_value=-1).tolist(),
+        special[sections['Course'].cat.codes.to_numpy()].tolist(),
+    ))
+    return zip(keys, records)
+
+def meeting_days(record):
+    # Day codes of a section; meetings that end at or before their start never clash
+    if record.start >= record.end:
+        return []
+    return [d for d in range(len(days_order)) if record.day_mask >> d & 1]
+
+def attach_section(state, sid, record):
+    state.records[sid] = record
+    state.members.setdefault(record.dept, set()).add(sid)
+    for day in meeting_days(record):
+        state.index.insert((record.dept, day), record.start, record.end, sid)
+
+def detach_section(state, sid):
+    record = state.records.pop(sid)
+    state.members[record.dept].discard(sid)
+    for day in meeting_days(record):
+        state.index.remove((record.dept, day), record.start, record.end, sid)
+    return record
+
+def department_clashes(state, dept):
+    # Grouped clash rows for one department, oriented by upload order like a full run
+    level_matrix = state.rules.level_pair_matrix[state.rules.department_index.get(dept, -1)]
+    entries = []
+    for day in range(len(days_order)):
+        for x, y in state.index.overlapping_pairs((dept, day)):
+            if state.positions[x] > state.positions[y]:
+                x, y = y, x
+            a, b = state.records[x], state.records[y]
+            if a.level < 0 or b.level < 0:
+                continue
+            red = level_matrix[a.level // 100, b.level // 100]
+            entries.append((dept, a.course, a.section, b.course, b.section, a.time,
+                            days_order[day], "red-row" if red else "green-row"))
+    frame = pd.DataFrame(entries, columns=[
+        "Department", "Course A", "Section A", "Course B", "Section B", "Time", "Day(s)", "RowClass",
+    ])
+    return group_clash_days(frame, "Department")
+
+@instrumented("update_clash_report")
+def update_clash_state(state, sections):
+    # Diff a re-uploaded schedule against the state and rebuild only what changed
+    rules = state.rules
+    touched = set()
+    seen = set()
+    positions = {}
+    last_position = {}
+
+    # Matching a large upload takes a while, so it reports progress per section;
+    # the department rebuild below is its own stage
+    total = int(sections['Department'].notna().sum())
+    for position, (key, record) in enumerate(section_records(sections, rules)):
+        progress(position + 1, total)
+        seen.add(key)
+        sid = state.ids.get(key)
+        if sid is None:
+            sid = state.ids[key] = state.next_id
+            state.next_id += 1
+        elif state.records[sid] == record:
+            # Unchanged, but a reordered upload still flips which section reads as "A"
+            previous = state.positions[sid]
+            if previous < last_position.get(record.dept, -1):
+                touched.add(record.dept)
+            last_position[record.dept] = previous
+            positions[sid] = position
+            continue
+        else:
+            touched.add(detach_section(state, sid).dept)
+        attach_section(state, sid, record)
+        touched.add(record.dept)
+        positions[sid] = position
+
+    for key in [key for key in state.ids if key not in seen]:
+        touched.add(detach_section(state, state.ids.pop(key)).dept)
+    state.positions = positions
+    count(sections=len(positions), touched_departments=len(touched))
+
+    # Rebuild the report sections of touched departments only
+    with stage("rebuild_departments"):
+        touched_sections = sections[sections['Department'].isin(touched).to_numpy()]
+        meetings = expand_meetings(touched_sections)
+        free_slots, availability = free_slot_overview(meetings, rules.blocked_windows)
+        for dept in touched:
+            for part in (state.blocked, state.clashes, state.free_slots, state.availability):
+                part.pop(dept, None)
+            if not state.members.get(dept):
+                state.members.pop(dept, None)
+        groups = meetings.groupby('Department', observed=True)
+        for done, (dept, g) in enumerate(groups, start=1):
+            state.blocked[dept] = blocked_window_entries(dept, g, rules)
+            state.clashes[dept] = department_clashes(state, dept)
+            progress(done, groups.ngroups)
+        state.free_slots.update(free_slots)
+        state.availability.update(availability)
+
+    frames = [state.clashes[dept] for dept in sorted(state.clashes) if not state.clashes[dept].empty]
+    # Resources span departments; their sweep is cheap enough to redo over everything
+    departments = report_departments(sections)
+    state.result = DepartmentClashResult(
+        departments=departments,
+        clashes=pd.concat(frames, ignore_index=True) if frames else group_clash_days(pd.DataFrame(), "Department"),
+        wednesday_4_5=[entry for dept in sorted(state.blocked) for entry in state.blocked[dept]],
+        free_slots={dept: state.free_slots.get(dept, {}) for dept in departments},
+        availability=dict(state.availability),
+        blocked_windows=[(days_order[d], start, end, label) for d, start, end, label in rules.blocked_windows],
+        resources=resource_clash_report(expand_meetings(sections)),
+    )
+    return state
+
+def seed_index(state, sections):
+    # Records and interval index of a whole upload in bulk: each (dept, day) bucket
+    # is filled and sorted once instead of taking one insert per section
+    buckets = {}
+    for sid, (key, record) in enumerate(section_records(sections, state.rules)):
+        state.ids[key] = sid
+        state.records[sid] = record
+        state.positions[sid] = sid
+        state.members.setdefault(record.dept, set()).add(sid)
+        for day in meeting_days(record):
+            buckets.setdefault((record.dept, day), []).append((record.start, record.end, sid))
+    state.next_id = len(state.records)
+    for bucket, items in buckets.items():
+        items.sort()
+        state.index.buckets[bucket] = items
+        state.index.longest[bucket] = max(end - start for start, end, _ in items)
+    count(sections=len(state.records))
+
+def build_clash_state(sections, rules=None):
+    # First analysis of an upload. The report comes from the vectorized full run
+    # (generate_clash_report) and is split into the per-department parts that
+    # update_clash_state replaces on edits; only the index is built here.
+    state = ClashState(rules=rules or load_rules())
+    result = generate_clash_report(sections, rules=state.rules)
+    with stage("index_sections"):
+        seed_index(state, sections)
+    for entry in result.wednesday_4_5:
+        state.blocked.setdefault(entry['Department'], []).append(entry)
+    state.clashes = {dept: g.reset_index(drop=True) for dept, g in result.clashes.groupby('Department', sort=False)}
+    state.free_slots = dict(result.free_slots)
+    state.availability = dict(result.availability)
+    state.result = result
+    return state
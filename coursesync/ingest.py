@@ -0,0 +1,126 @@
+"""Reading registrar exports into DataFrames."""
+import hashlib
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .instrument import count, instrumented
+from .schedule import RESOURCE_COLUMNS
+
+# --------------------------
+# Schedule Columns
+# --------------------------
+# Registrar exports carry dozens of columns; only these are read, all as text so
+# section numbers keep their leading zeros whether the export is CSV or Excel.
+# Instructor, Room and Cohort are optional; "Program" is read as the cohort.
+
+SCHEDULE_COLUMNS = ['Course', 'Section #', 'Course Title', 'Meeting Pattern'] + RESOURCE_COLUMNS
+REQUIRED_COLUMNS = ['Course', 'Section #', 'Meeting Pattern']
+COLUMN_ALIASES = {'Program': 'Cohort'}
+CSV_CHUNK_ROWS = 50_000
+CACHE_VERSION = 2   # bump when the cached column layout changes
+
+def is_schedule_column(col):
+    return col in SCHEDULE_COLUMNS or col in COLUMN_ALIASES
+
+def check_columns(df, name):
+    for alias, col in COLUMN_ALIASES.items():
+        if alias in df.columns and col not in df.columns:
+            df = df.rename(columns={alias: col})
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"{os.path.basename(name)} is missing column(s): {', '.join(missing)}")
+    return df[[col for col in SCHEDULE_COLUMNS if col in df.columns]]
+
+def read_csv_columns(source):
+    # Streams the file in chunks so the parser never holds more than one chunk of
+    # unused columns at a time
+    chunks = pd.read_csv(source, usecols=is_schedule_column, dtype=str, chunksize=CSV_CHUNK_ROWS)
+    return pd.concat(chunks, ignore_index=True)
+
+def cell_text(value):
+    # Excel stores whole numbers as floats; 4.0 should read as "4" like pandas does
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def read_workbook_columns(source):
+    # Read-only openpyxl streams rows without building the cell tree, and only the
+    # wanted columns of the first sheet are converted
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        positions = {}
+        for i, header in enumerate(next(rows, ())):
+            if is_schedule_column(header):
+                positions.setdefault(header, i)
+        columns = {header: [] for header in positions}
+        for row in rows:
+            for header, i in positions.items():
+                columns[header].append(cell_text(row[i]) if i < len(row) else None)
+    finally:
+        workbook.close()
+
+    # Trailing blank rows are formatting leftovers, not sections
+    n_rows = max((i + 1 for values in columns.values() for i, v in enumerate(values) if v is not None), default=0)
+    return pd.DataFrame({header: values[:n_rows] for header, values in columns.items()}, dtype=str)
+
+def read_export(source, name):
+    if name.endswith('.csv'):
+        df = read_csv_columns(source)
+    elif name.endswith('.feather'):
+        df = pd.read_feather(source)
+    elif name.endswith('.parquet'):
+        df = pd.read_parquet(source)
+    else:
+        df = read_workbook_columns(source)
+    return check_columns(df, name)
+
+# --------------------------
+# Columnar Cache
+# --------------------------
+# An export can be converted once into <cache_dir>/<sha256>.feather (needs pyarrow);
+# later runs on the same file content load the few schedule columns directly.
+
+def content_digest(source):
+    # sha256 of a path's or a binary buffer's content; buffers are rewound afterwards
+    digest = hashlib.sha256(f"v{CACHE_VERSION}:".encode())
+    if hasattr(source, "read"):
+        position = source.tell()
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+        source.seek(position)
+    else:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+def cache_schedule(df, path):
+    # Write to a temporary name first so a concurrent reader never sees half a file
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    df.to_feather(partial)
+    os.replace(partial, path)
+    return path
+
+@instrumented("read_schedule")
+def read_schedule(source, name=None, cache_dir=None):
+    # `source` is a path or a binary buffer; `name` decides the format for buffers.
+    # With cache_dir, the first read of a file stores a Feather copy there.
+    name = name or os.fspath(source)
+    if cache_dir is None or name.endswith(('.feather', '.parquet')):
+        df = read_export(source, name)
+    else:
+        cached = os.path.join(cache_dir, content_digest(source) + ".feather")
+        if os.path.exists(cached):
+            df = pd.read_feather(cached)
+            count(cache_hits=1)
+        else:
+            df = read_export(source, name)
+            cache_schedule(df, cached)
+    count(rows=len(df))
+    return df
@@ -0,0 +1,142 @@
+"""Per-stage timing, peak memory and counters for one pipeline run."""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import wraps
+
+# --------------------------
+# Pipeline Profile
+# --------------------------
+# Stages are recorded only while a profile is active (see `profiled`), so library
+# calls outside the app or the CLI's --profile flag pay nothing. Inside a stage,
+# `count(...)` attaches counters (rows, meetings, candidate pairs, clashes) to the
+# innermost open span.
+
+_active = ContextVar("coursesync_profile", default=None)
+_job = ContextVar("coursesync_job", default=None)
+
+# tracemalloc has one state per process, so memory-traced stages on different threads
+# (app script thread, background jobs) take turns: a traced span holds this lock from
+# start to end, and nested spans on the same thread re-enter it
+_memory_lock = threading.RLock()
+
+@dataclass
+class PipelineProfile:
+    trace_memory: bool = False   # tracemalloc peaks; accurate but slows the run down
+    source: str = ""             # file the run was for, copied into every exported line
+    spans: list = field(default_factory=list)     # in start order; depth > 0 for nested stages
+    started: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    _open: list = field(default_factory=list, repr=False)
+
+    def records(self):
+        return [{"timestamp": self.started, "source": self.source, **span} for span in self.spans]
+
+    def to_jsonl(self):
+        return "".join(json.dumps(record, default=str) + "\n" for record in self.records())
+
+@contextmanager
+def profiled(profile=None, trace_memory=False, source=""):
+    # Activate a profile (a new one unless given) for everything run in the block
+    profile = profile or PipelineProfile(trace_memory=trace_memory, source=source)
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+# --------------------------
+# Background Job Hooks
+# --------------------------
+# A background job (see jobs.py) is told about every stage it enters and about
+# per-item progress inside a stage; those and `checkpoint()` in long loops are
+# where a cancelled job stops.
+
+class JobCancelled(Exception):
+    pass
+
+@contextmanager
+def tracking(job):
+    token = _job.set(job)
+    try:
+        yield job
+    finally:
+        _job.reset(token)
+
+def progress(done, total):
+    # Items (e.g. departments) finished in the current stage of the active job, if any
+    job = _job.get()
+    if job is not None:
+        job.advance(done, total)
+
+def checkpoint():
+    # Stop here if the active job was cancelled; a no-op outside jobs
+    job = _job.get()
+    if job is not None:
+        job.check()
+
+@contextmanager
+def stage(name):
+    job = _job.get()
+    if job is not None:
+        job.enter(name)
+    profile = _active.get()
+    if profile is None:
+        yield {}
+        return
+
+    span = {"stage": name, "depth": len(profile._open)}
+    tracing = profile.trace_memory
+    if tracing:
+        _memory_lock.acquire()
+    started_tracing = tracing and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if profile._open:
+            # Fold the outer span's peak so far in before resetting it for this one
+            outer = profile._open[-1]
+            outer["_peak"] = max(outer["_peak"], peak)
+        tracemalloc.reset_peak()
+        span["_base"], span["_peak"] = current, current
+
+    profile._open.append(span)
+    profile.spans.append(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span["seconds"] = round(time.perf_counter() - start, 6)
+        profile._open.pop()
+        if tracing:
+            peak = max(span.pop("_peak"), tracemalloc.get_traced_memory()[1])
+            span["peak_mib"] = round((peak - span.pop("_base")) / 2**20, 3)
+            if profile._open:
+                outer = profile._open[-1]
+                outer["_peak"] = max(outer["_peak"], peak)
+            if started_tracing:
+                tracemalloc.stop()
+            _memory_lock.release()
+
+def count(**counters):
+    # Add counters to the innermost open stage, if a profile is active
+    profile = _active.get()
+    if profile is not None and profile._open:
+        span = profile._open[-1]
+        for key, value in counters.items():
+            span[key] = span.get(key, 0) + int(value)
+
+def instrumented(name):
+    # Decorator form of `stage` for whole pipeline functions
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,104 @@
+"""Sweep-line overlap detection over (day, start, end) meetings."""
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+
+from .instrument import checkpoint
+
+
+def find_overlapping_pairs(days, starts, ends):
+    # Sweep-line over meetings sorted by (day, start): keep only the meetings still
+    # running at the current start, so cost is O(n log n + clashes) instead of O(n²).
+    # Returns (i, j) index pairs with i < j whose half-open [start, end) ranges intersect.
+    order = sorted(range(len(starts)), key=lambda k: (days[k], starts[k]))
+    pairs = []
+    active = []
+    current_day = None
+    for k in order:
+        if days[k] != current_day:
+            checkpoint()
+            current_day = days[k]
+            active = []
+        start, end = starts[k], ends[k]
+        active = [a for a in active if ends[a] > start]
+        if start >= end:
+            continue
+        for a in active:
+            pairs.append((a, k) if a < k else (k, a))
+        active.append(k)
+    pairs.sort()
+    return pairs
+
+def find_overlapping_pairs_between(days, starts, ends, left, right):
+    # Bipartite variant of the sweep: only pairs with one meeting from each side are
+    # returned. Each side's active list is pruned lazily, when a meeting from the other
+    # side arrives, so overlaps within one side cost nothing.
+    order = sorted(range(len(starts)), key=lambda k: (days[k], starts[k]))
+    pairs = []
+    active_left, active_right = [], []
+    current_day = None
+    for k in order:
+        if days[k] != current_day:
+            checkpoint()
+            current_day = days[k]
+            active_left, active_right = [], []
+        start, end = starts[k], ends[k]
+        if start >= end:
+            continue
+        partners = []
+        if left[k]:
+            active_right = [a for a in active_right if ends[a] > start]
+            partners += active_right
+        if right[k]:
+            active_left = [a for a in active_left if ends[a] > start]
+            partners += [a for a in active_left if not (left[k] and right[a])]
+        for a in partners:
+            pairs.append((a, k) if a < k else (k, a))
+        if left[k]:
+            active_left.append(k)
+        if right[k]:
+            active_right.append(k)
+    pairs.sort()
+    return pairs
+
+# --------------------------
+# Bucketed Interval Index
+# --------------------------
+
+@dataclass
+class IntervalIndex:
+    # bucket (e.g. (dept, day)) -> meetings sorted by start as (start, end, id). The
+    # longest meeting ever stored in a bucket bounds how far back a query looks.
+    buckets: dict = field(default_factory=dict)
+    longest: dict = field(default_factory=dict)
+
+    def insert(self, bucket, start, end, sid):
+        insort(self.buckets.setdefault(bucket, []), (start, end, sid))
+        self.longest[bucket] = max(self.longest.get(bucket, 0), end - start)
+
+    def remove(self, bucket, start, end, sid):
+        items = self.buckets[bucket]
+        del items[bisect_left(items, (start, end, sid))]
+
+    def overlapping(self, bucket, start, end):
+        # Ids of stored meetings overlapping [start, end); like the sweeps, a meeting
+        # that ends at or before its start overlaps nothing
+        if start >= end:
+            return
+        items = self.buckets.get(bucket, [])
+        k = bisect_left(items, (start - self.longest.get(bucket, 0),))
+        while k < len(items) and items[k][0] < end:
+            if items[k][1] > max(start, items[k][0]):
+                yield items[k][2]
+            k += 1
+
+    def overlapping_pairs(self, bucket):
+        # Every overlapping (earlier id, later id) pair in one bucket, by the same sweep
+        # as find_overlapping_pairs over the already start-sorted meetings
+        active = []
+        for start, end, sid in self.buckets.get(bucket, []):
+            active = [a for a in active if a[1] > start]
+            if start >= end:
+                continue
+            for _, _, other in active:
+                yield (other, sid) if other < sid else (sid, other)
+            active.append((start, end, sid))
@@ -0,0 +1,126 @@
+"""Background analysis jobs on a bounded worker pool shared by all sessions."""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .clashes import generate_cross_dept_clash_report
+from .export import clash_tables, export_archive
+from .incremental import build_clash_state, update_clash_state
+from .instrument import JobCancelled, PipelineProfile, profiled, tracking
+from .render import iter_clash_report_html, iter_cross_report_html, render_report_bytes
+
+# --------------------------
+# Worker Pool
+# --------------------------
+# Threads rather than processes: the incremental clash state is updated in place
+# and progress is read straight off the job object. The pool is per server
+# process, so however many sessions press "Process" at once, at most
+# COURSESYNC_JOB_WORKERS analyses run and the rest wait their turn.
+
+DEFAULT_JOB_WORKERS = 2
+
+@lru_cache(maxsize=None)
+def job_pool(max_workers=None):
+    workers = max_workers or int(os.environ.get("COURSESYNC_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+    return ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="coursesync-job")
+
+@dataclass
+class AnalysisJob:
+    stages: list                  # top-level stage names in run order; the progress bar splits evenly over them
+    profile: PipelineProfile = field(default_factory=PipelineProfile)
+    future: object = None
+    started: bool = False
+    stage: str = ""
+    stage_index: int = -1
+    done: int = 0                 # items (sections, departments, rule pairs) finished in the current stage ...
+    total: int = 0                # ... out of this many, when the stage reports them
+    cancel_requested: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    # Called from the worker thread through instrument.stage / instrument.progress
+    def enter(self, name):
+        self.check()
+        if name in self.stages:
+            self.stage, self.stage_index = name, self.stages.index(name)
+            self.done = self.total = 0
+
+    def advance(self, done, total):
+        self.check()
+        self.done, self.total = done, total
+
+    def check(self):
+        if self.cancel_requested.is_set():
+            raise JobCancelled(self.stage)
+
+    # Polled from the UI thread
+    def cancel(self):
+        self.cancel_requested.set()
+        self.future.cancel()      # only succeeds while the job is still queued
+
+    @property
+    def status(self):
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            error = self.future.exception()
+            if error is None:
+                return "done"
+            return "cancelled" if isinstance(error, JobCancelled) else "failed"
+        return "running" if self.started else "queued"
+
+    @property
+    def fraction(self):
+        if self.future.done():
+            return 1.0
+        if self.stage_index < 0:
+            return 0.0
+        within = self.done / self.total if self.total else 0.0
+        return min((self.stage_index + within) / len(self.stages), 1.0)
+
+    @property
+    def label(self):
+        if not self.started:
+            return "Waiting for a free worker…"
+        detail = f" ({self.done}/{self.total})" if self.total else ""
+        return f"{self.stage or 'starting'}{detail}"
+
+def submit_job(func, *args, stages=(), profile=None, pool=None, **kwargs):
+    # Runs func(*args, **kwargs) on the pool with stage/progress tracking and the
+    # given profile active; the caller polls the returned job
+    job = AnalysisJob(stages=list(stages), profile=profile or PipelineProfile())
+
+    def run():
+        job.started = True
+        with tracking(job), profiled(job.profile):
+            return func(*args, **kwargs)
+
+    job.future = (pool or job_pool()).submit(run)
+    return job
+
+# --------------------------
+# App Analysis Job
+# --------------------------
+
+# A first analysis runs the full department-wise report and indexes it; a re-upload
+# in the same session updates that state instead
+ANALYZE_UPLOAD_STAGES = {
+    "build": ["generate_clash_report", "index_sections"],
+    "update": ["update_clash_report", "rebuild_departments"],
+}
+ANALYZE_UPLOAD_REPORT_STAGES = ["generate_cross_dept_clash_report", "render_report", "export_tables"]
+
+def analyze_upload_stages(state=None):
+    # Progress stages of analyze_upload(sections, state)
+    return ANALYZE_UPLOAD_STAGES["build" if state is None else "update"] + ANALYZE_UPLOAD_REPORT_STAGES
+
+def analyze_upload(sections, state=None, rules=None):
+    # Everything "Process Schedule" shows: the department-wise clash state (updated in
+    # place when given, so drop it if the job fails), the cross-department result
+    # and both rendered reports, plus the zipped data export
+    state = build_clash_state(sections, rules=rules) if state is None else update_clash_state(state, sections)
+    cross_result = generate_cross_dept_clash_report(sections, rules=rules)
+    clash_file = render_report_bytes(iter_clash_report_html(state.result))
+    cross_file = render_report_bytes(iter_cross_report_html(cross_result))
+    data_file = export_archive(clash_tables(state.result, cross_result))
+    return state, cross_result, clash_file, cross_file, data_file
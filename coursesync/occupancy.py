@@ -0,0 +1,101 @@
+"""Minute-resolution occupancy bitmaps and the weekly free-slot overview."""
+import numpy as np
+
+from .schedule import days_order
+
+# --------------------------
+# Free Slot Bounds
+# --------------------------
+
+FREE_SLOT_START = 9 * 60          # first minute a free slot can start (9:00 AM)
+FREE_SLOT_END = 20 * 60 + 50      # free slots run until 8:50 PM
+MIN_FREE_MINUTES = 50             # shorter gaps are not worth reporting
+FREE_SLOT_HOURS = list(range(FREE_SLOT_START, 20 * 60 + 1, 60))  # 1-hour overview rows, 9 AM–8 PM
+LAST_HOUR = FREE_SLOT_HOURS[-1]   # the 8 PM row only needs a 50-minute gap that reaches it
+
+DAY_MINUTES = 24 * 60
+GRID_WIDTH = DAY_MINUTES - FREE_SLOT_START
+
+# --------------------------
+# Occupancy Bitmap
+# --------------------------
+# One row per (department, weekday) and one column per minute from 9 AM to
+# midnight, filled for every department at once from a difference array.
+# Meetings that end at or before their start occupy nothing.
+
+def occupancy_bitmap(meetings):
+    codes = meetings['Department'].cat.codes.to_numpy().astype(np.int64)
+    valid = codes >= 0
+    key = codes[valid] * len(days_order) + meetings['Day'].to_numpy()[valid]
+    start = meetings['StartMin'].to_numpy()[valid].astype(np.int64)
+    end = meetings['EndMin'].to_numpy()[valid].astype(np.int64)
+    n_keys = len(meetings['Department'].cat.categories) * len(days_order)
+
+    s = np.clip(start, FREE_SLOT_START, DAY_MINUTES) - FREE_SLOT_START
+    e = np.clip(end, FREE_SLOT_START, DAY_MINUTES) - FREE_SLOT_START
+    spans = s < e
+    delta = np.zeros((n_keys, GRID_WIDTH + 1), dtype=np.int32)
+    np.add.at(delta, (key[spans], s[spans]), 1)
+    np.add.at(delta, (key[spans], e[spans]), -1)
+    busy = np.cumsum(delta[:, :-1], axis=1) > 0
+
+    # A free slot ends at 8:50 PM, or at the last class of the day if that runs later
+    horizon = np.full(n_keys, FREE_SLOT_END, dtype=np.int64)
+    np.maximum.at(horizon, key, end)
+    busy |= np.arange(GRID_WIDTH) >= (horizon - FREE_SLOT_START)[:, None]
+
+    present = np.zeros(n_keys // len(days_order), dtype=bool)
+    present[codes[valid]] = True
+    return busy, present
+
+def free_runs(busy):
+    # (row, start, end) of every maximal free run, in row-major order
+    padded = np.zeros((busy.shape[0], busy.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = ~busy
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts + FREE_SLOT_START, ends + FREE_SLOT_START
+
+# --------------------------
+# Weekly Available Slot Overview
+# --------------------------
+
+def free_slot_overview(meetings, blocked_windows):
+    # Returns (free_slots, availability) for every department in one pass:
+    #   free_slots:   dept -> day -> [(start_min, end_min)] gaps of 50+ minutes
+    #   availability: dept -> bool array (FREE_SLOT_HOURS x days_order), True when
+    #                 a free slot covers the whole hour
+    busy, present = occupancy_bitmap(meetings)
+    rows, fs, fe = free_runs(busy)
+    day = rows % len(days_order)
+
+    keep = (fe - fs >= MIN_FREE_MINUTES) & present[rows // len(days_order)]
+    # ❌ Exclude only the exact blocked slot (Wednesday 4–5 PM)
+    for day_code, start, end, _ in blocked_windows:
+        keep &= ~((day == day_code) & (fs == start) & (fe == end))
+    rows, day, fs, fe = rows[keep], day[keep], fs[keep], fe[keep]
+
+    # Hour h is covered by a run when the run starts by h and lasts through h + 60
+    n_hours = len(FREE_SLOT_HOURS)
+    first = np.clip(-(-(fs - FREE_SLOT_START) // 60), 0, n_hours)
+    stop = np.clip((fe - FREE_SLOT_START) // 60, 0, n_hours)
+    spans = first < stop
+    cover = np.zeros((busy.shape[0], n_hours + 1), dtype=np.int32)
+    np.add.at(cover, (rows[spans], first[spans]), 1)
+    np.add.at(cover, (rows[spans], stop[spans]), -1)
+    grid = np.cumsum(cover[:, :-1], axis=1) > 0
+    reaches_last = (fs <= LAST_HOUR) & (fe >= LAST_HOUR)
+    grid[rows[reaches_last], n_hours - 1] = True
+
+    categories = meetings['Department'].cat.categories
+    grid = grid.reshape(len(categories), len(days_order), n_hours).transpose(0, 2, 1)
+    free_slots = {
+        categories[d]: {name: [] for name in days_order}
+        for d in np.flatnonzero(present)
+    }
+    dept = rows // len(days_order)
+    for d, k, s, e in zip(dept.tolist(), day.tolist(), fs.tolist(), fe.tolist()):
+        free_slots[categories[d]][days_order[k]].append((s, e))
+    availability = {categories[d]: grid[d] for d in np.flatnonzero(present)}
+    return free_slots, availability
@@ -0,0 +1,244 @@
+"""Simulated-annealing optimizer that moves sections to clear red clashes."""
+import random
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .incremental import section_records
+from .rules import load_rules
+from .schedule import days_order
+from .whatif import day_pattern_label, pair_severity
+
+# --------------------------
+# Conflict Classes
+# --------------------------
+# Whether two sections make a red clash depends only on (department, level group,
+# special course, special level range), so sections are bucketed into classes and
+# the rules become one boolean class x class matrix. Per class and weekday the
+# optimizer keeps two prefix-count arrays over the minutes of the day:
+#   starts_before[c, d, x] = meetings of class c on day d starting before minute x
+#   ended_by[c, d, x]      = meetings of class c on day d ending at or before minute x
+# so the meetings of class c overlapping [s, e) number starts_before[e] - ended_by[s],
+# and moving a section is a handful of slice updates.
+
+DAY_MINUTES = 24 * 60
+
+def conflict_class(rules, record):
+    in_range = rules.special_min_level <= record.level <= rules.special_max_level
+    return record.dept, record.level // 100 if record.level >= 0 else -1, record.special, in_range
+
+def format_clock(minutes):
+    # Registrar-style time, e.g. 9:30am
+    hour, minute = divmod(int(minutes), 60)
+    return f"{hour % 12 or 12}:{minute:02d}{'am' if hour < 12 else 'pm'}"
+
+@dataclass
+class OptimizationResult:
+    moves: pd.DataFrame          # one row per moved section: from / to pattern and time
+    sections: pd.DataFrame       # the normalized schedule with the moves applied
+    initial_violations: int      # red meeting-pair clashes + blocked-window meetings before
+    final_violations: int        # ... and after
+    iterations: int
+    evaluated_moves: int         # candidate placements scored across all iterations
+
+    @property
+    def counts(self):
+        return {
+            "initial_violations": self.initial_violations,
+            "final_violations": self.final_violations,
+            "moved_sections": len(self.moves),
+        }
+
+
+@dataclass
+class Placements:
+    # Mutable search state: where every section meets, plus the per-class prefix counts
+    classes: np.ndarray
+    day_mask: np.ndarray
+    start: np.ndarray
+    duration: np.ndarray
+    starts_before: np.ndarray
+    ended_by: np.ndarray
+
+    def place(self, i, day_mask, start, sign):
+        # sign=+1 puts section i at (day_mask, start); sign=-1 takes it out again
+        c, end = self.classes[i], start + self.duration[i]
+        for d in range(len(days_order)):
+            if day_mask >> d & 1:
+                self.starts_before[c, d, start + 1:] += sign
+                self.ended_by[c, d, end:] += sign
+        if sign > 0:
+            self.day_mask[i], self.start[i] = day_mask, start
+
+def build_placements(records, classes, n_classes):
+    shape = (n_classes, len(days_order), DAY_MINUTES + 1)
+    placements = Placements(
+        classes=np.array(classes, dtype=np.int64),
+        day_mask=np.array([r.day_mask for r in records], dtype=np.int64),
+        start=np.array([r.start for r in records], dtype=np.int64),
+        duration=np.array([r.end - r.start for r in records], dtype=np.int64),
+        starts_before=np.zeros(shape, dtype=np.int32),
+        ended_by=np.zeros(shape, dtype=np.int32),
+    )
+    for i in np.flatnonzero(placements.duration > 0):
+        placements.place(i, placements.day_mask[i], placements.start[i], 1)
+    return placements
+
+
+def blocked_meetings(rules, day_masks, starts, duration):
+    counts = np.zeros(len(starts), dtype=np.int64)
+    for day, start, end, _ in rules.blocked_windows:
+        counts += ((day_masks >> day) & 1) * ((starts < end) & (starts + duration > start))
+    return counts
+
+def candidate_placements(records, i, day_masks_by_dept, earliest, latest, step):
+    # Same number of meeting days as today, any pattern the department uses, on a
+    # fixed start grid; the current placement is always candidate 0
+    record = records[i]
+    duration = record.end - record.start
+    n_days = bin(record.day_mask).count("1")
+    masks = [m for m in sorted(day_masks_by_dept[record.dept]) if bin(m).count("1") == n_days and m != record.day_mask]
+    grid = np.arange(earliest, latest - duration + 1, step)
+    cand_masks = np.concatenate([[record.day_mask], np.repeat(masks, len(grid)), np.full(len(grid), record.day_mask)])
+    cand_starts = np.concatenate([[record.start], np.tile(grid, len(masks)), grid])
+    keep = np.ones(len(cand_starts), dtype=bool)
+    keep[1:] = ~((cand_masks[1:] == record.day_mask) & (cand_starts[1:] == record.start))
+    return cand_masks[keep].astype(np.int64), cand_starts[keep].astype(np.int64)
+
+def optimize_schedule(sections, rules=None, iterations=20000, seed=0, movable=None, move_penalty=0.5,
+                      temperature=2.0, final_temperature=0.02, earliest=8 * 60, latest=22 * 60, step=15):
+    # Searches for new (days, start) placements that minimize red clashes and
+    # blocked-window meetings, paying move_penalty for every section moved away
+    # from its uploaded slot. movable is a list of (Course, Section #, occurrence)
+    # keys; by default the sections involved in a violation today.
+    rules = rules or load_rules()
+    keyed = list(section_records(sections, rules))
+    keys = [key for key, _ in keyed]
+    records = [record for _, record in keyed]
+
+    class_ids, representatives, classes = {}, [], []
+    for record in records:
+        key = conflict_class(rules, record)
+        if key not in class_ids:
+            class_ids[key] = len(representatives)
+            representatives.append(record)
+        classes.append(class_ids[key])
+    red = np.array([[pair_severity(rules, a, b) == "red" for b in representatives] for a in representatives],
+                   dtype=bool).reshape(len(representatives), len(representatives))
+    red_classes = [np.flatnonzero(row) for row in red]
+
+    problem = build_placements(records, classes, len(representatives))
+    day_masks_by_dept = {}
+    for record in records:
+        day_masks_by_dept.setdefault(record.dept, set()).add(record.day_mask)
+
+    def placement_costs(i, masks, starts):
+        # Red clashes + blocked-window meetings for section i at each candidate, with
+        # section i itself taken out of the prefix counts
+        reds = red_classes[problem.classes[i]]
+        duration = problem.duration[i]
+        counts = np.zeros(len(starts), dtype=np.int64)
+        if len(reds):
+            for d in range(len(days_order)):
+                on_day = (masks >> d) & 1
+                if not on_day.any():
+                    continue
+                overlapping = (problem.starts_before[reds[:, None], d, starts + duration].sum(axis=0) -
+                               problem.ended_by[reds[:, None], d, starts].sum(axis=0))
+                counts += on_day * overlapping
+        return counts + blocked_meetings(rules, masks, starts, duration)
+
+    # Violations today: each red pair is seen from both ends
+    movable_ids = []
+    red_total, blocked_total = 0, 0
+    for i in np.flatnonzero(problem.duration > 0):
+        problem.place(i, problem.day_mask[i], problem.start[i], -1)
+        cost = placement_costs(i, problem.day_mask[i:i + 1], problem.start[i:i + 1])[0]
+        blocked = blocked_meetings(rules, problem.day_mask[i:i + 1], problem.start[i:i + 1], problem.duration[i])[0]
+        problem.place(i, problem.day_mask[i], problem.start[i], 1)
+        red_total += cost - blocked
+        blocked_total += blocked
+        if cost:
+            movable_ids.append(i)
+    initial = red_total // 2 + blocked_total
+    if movable is not None:
+        wanted = set(movable)
+        movable_ids = [i for i, key in enumerate(keys) if key in wanted and problem.duration[i] > 0]
+
+    candidates = {}
+    original = {i: (int(problem.day_mask[i]), int(problem.start[i])) for i in movable_ids}
+    rng = random.Random(seed)
+    evaluated = 0
+    cooling = (final_temperature / temperature) ** (1 / max(iterations, 1))
+    t = temperature
+
+    def resample(i, t):
+        # Heat-bath move: score every candidate placement for section i and draw one
+        # with probability proportional to exp(-cost / t)
+        nonlocal evaluated
+        if i not in candidates:
+            candidates[i] = candidate_placements(records, i, day_masks_by_dept, earliest, latest, step)
+        masks, starts = candidates[i]
+        problem.place(i, problem.day_mask[i], problem.start[i], -1)
+        costs = placement_costs(i, masks, starts) + move_penalty * (np.arange(len(starts)) > 0)
+        evaluated += len(starts)
+        if t <= 0:
+            k = int(np.argmin(costs))
+        else:
+            weights = np.exp(-(costs - costs.min()) / t)
+            k = int(np.searchsorted(np.cumsum(weights), rng.random() * weights.sum(), side="right"))
+            k = min(k, len(starts) - 1)
+        problem.place(i, masks[k], starts[k], 1)
+
+    if movable_ids:
+        for _ in range(iterations):
+            resample(movable_ids[rng.randrange(len(movable_ids))], t)
+            t *= cooling
+        # Greedy polish: settle every movable section on its best placement
+        for _ in range(2):
+            for i in movable_ids:
+                resample(i, 0)
+
+    # Recount from scratch and describe the moves
+    red_total, blocked_total = 0, 0
+    for i in np.flatnonzero(problem.duration > 0):
+        problem.place(i, problem.day_mask[i], problem.start[i], -1)
+        blocked = blocked_meetings(rules, problem.day_mask[i:i + 1], problem.start[i:i + 1], problem.duration[i])[0]
+        red_total += placement_costs(i, problem.day_mask[i:i + 1], problem.start[i:i + 1])[0] - blocked
+        blocked_total += blocked
+        problem.place(i, problem.day_mask[i], problem.start[i], 1)
+
+    moved = [i for i in movable_ids if (problem.day_mask[i], problem.start[i]) != original[i]]
+    moves = pd.DataFrame([{
+        "Course": records[i].course,
+        "Section #": records[i].section,
+        "From Days": day_pattern_label(original[i][0]),
+        "From Time": records[i].time,
+        "To Days": day_pattern_label(problem.day_mask[i]),
+        "To Time": f"{format_clock(problem.start[i])}–{format_clock(problem.start[i] + problem.duration[i])}",
+    } for i in moved], columns=["Course", "Section #", "From Days", "From Time", "To Days", "To Time"])
+
+    return OptimizationResult(
+        moves=moves,
+        sections=apply_moves(sections, keys, problem, moved),
+        initial_violations=int(initial),
+        final_violations=int(red_total // 2 + blocked_total),
+        iterations=iterations if movable_ids else 0,
+        evaluated_moves=evaluated,
+    )
+
+def apply_moves(sections, keys, problem, moved):
+    sections = sections.copy()
+    if not moved:
+        return sections
+    valid_rows = np.flatnonzero(sections['Department'].notna().to_numpy())
+    rows = valid_rows[moved]
+    labels = [f"{format_clock(problem.start[i])}–{format_clock(problem.start[i] + problem.duration[i])}" for i in moved]
+    sections['Time'] = sections['Time'].cat.add_categories(sorted(set(labels) - set(sections['Time'].cat.categories)))
+    columns = [sections.columns.get_loc(col) for col in ('DayMask', 'StartMin', 'EndMin', 'Time')]
+    sections.iloc[rows, columns[0]] = problem.day_mask[moved].astype('uint8')
+    sections.iloc[rows, columns[1]] = problem.start[moved].astype('int16')
+    sections.iloc[rows, columns[2]] = (problem.start[moved] + problem.duration[moved]).astype('int16')
+    sections.iloc[rows, columns[3]] = labels
+    return sections
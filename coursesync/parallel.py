@@ -0,0 +1,104 @@
+"""Process-pool fan-out over departments, backed by shared compact arrays."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .instrument import progress
+from .schedule import expand_meetings
+
+# --------------------------
+# Shared sections table
+# --------------------------
+# The compact sections table is copied once into a single shared-memory block.
+# Categorical columns travel as integer codes and only their category lists are
+# pickled, so each worker attaches to the same arrays instead of receiving a copy
+# of the frame with every task.
+
+def share_sections(sections):
+    arrays, categories = {}, {}
+    for col in sections.columns:
+        values = sections[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[col] = values.cat.codes.to_numpy()
+            categories[col] = values.cat.categories
+        elif col == 'Level':
+            arrays[col] = values.to_numpy(dtype='int16', na_value=-1)
+        else:
+            arrays[col] = values.to_numpy()
+
+    layout, offset = [], 0
+    for col, arr in arrays.items():
+        layout.append((col, arr.dtype.str, len(arr), offset))
+        offset += -(-arr.nbytes // 8) * 8
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (col, dtype, length, start), arr in zip(layout, arrays.values()):
+        np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=start)[:] = arr
+
+    return shm, {"name": shm.name, "layout": layout, "categories": categories}
+
+def attach_sections(handle):
+    # Pool workers share the parent's resource tracker, so attaching here does not
+    # hand ownership over; the parent still closes and unlinks the block
+    shm = shared_memory.SharedMemory(name=handle["name"])
+
+    columns = {}
+    for col, dtype, length, start in handle["layout"]:
+        arr = np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=start)
+        if col in handle["categories"]:
+            columns[col] = pd.Categorical.from_codes(arr, categories=handle["categories"][col])
+        elif col == 'Level':
+            columns[col] = pd.arrays.IntegerArray(arr, arr < 0)
+        else:
+            columns[col] = arr
+    return shm, pd.DataFrame(columns)
+
+# --------------------------
+# Department fan-out
+# --------------------------
+
+_worker = {}
+
+def _init_worker(handle, func, args):
+    _worker["shm"], _worker["sections"] = attach_sections(handle)
+    _worker["func"], _worker["args"] = func, args
+
+def _run_department(dept):
+    sections = _worker["sections"]
+    group = sections[(sections['Department'] == dept).to_numpy()]
+    return _worker["func"](dept, expand_meetings(group), *_worker["args"])
+
+def resolve_workers(workers):
+    # None or 1 runs serially; 0 (or a negative number) means every core
+    if workers is None:
+        return 1
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def map_departments(sections, func, *args, workers=None):
+    # Apply func(dept, meetings, *args) to every department, returning [(dept, result)]
+    # in category order whether it ran serially or in a process pool
+    codes = sections['Department'].cat.codes.to_numpy()
+    departments = list(sections['Department'].cat.categories[np.unique(codes[codes >= 0])])
+    workers = min(resolve_workers(workers), len(departments))
+
+    if workers <= 1:
+        results = []
+        for done, (dept, group) in enumerate(sections.groupby('Department', observed=True), start=1):
+            results.append((dept, func(dept, expand_meetings(group), *args)))
+            progress(done, len(departments))
+        return results
+
+    shm, handle = share_sections(sections)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(handle, func, args)) as pool:
+            results = []
+            for done, (dept, result) in enumerate(zip(departments, pool.map(_run_department, departments)), start=1):
+                results.append((dept, result))
+                progress(done, len(departments))
+            return results
+    finally:
+        shm.close()
+        shm.unlink()
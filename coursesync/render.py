@@ -0,0 +1,223 @@
+"""Streaming HTML rendering for the clash reports."""
+import io
+import os
+from collections import defaultdict
+
+from .instrument import checkpoint, count, instrumented, stage
+from .occupancy import FREE_SLOT_HOURS
+from .schedule import days_order, format_minutes
+
+# --------------------------
+# Streaming HTML Rendering
+# --------------------------
+# Reports are produced as generators of small chunks and written through the
+# file's own buffer, so peak memory stays flat however many clashes there are.
+
+# One stylesheet for every report; cells carry class names instead of inline styles
+REPORT_CSS = """
+        body { font-family: Arial; padding: 20px; background: #f9f9f9; }
+        h1 { text-align: center; color: #002855; }
+        h2 { color: #003366; margin-top: 40px; }
+        table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+        th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ccc; }
+        th { background-color: #004B87; color: white; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        .red-row { background-color: #ffdddd !important; }
+        .green-row { background-color: #ddffdd !important; }
+        .new-row { background-color: #ffdddd !important; }
+        .resolved-row { background-color: #ddffdd !important; }
+        .violations { color: red; font-weight: bold; }
+        .accepted { color: green; font-weight: bold; }
+        .summary { text-align: center; font-weight: bold; }
+        .slots { text-align: center; }
+        .slots th, .slots td { border: 1px solid #aaa; }
+        .free { color: green; }
+        .busy { color: #bbb; }
+        .locked { color: red; }
+"""
+
+def report_head(title):
+    return f"<html><head><title>{title}</title><style>{REPORT_CSS}</style></head><body>"
+
+CLASH_TABLE_HEADER = "<table><tr><th>Course A</th><th>Section A</th><th>Course B</th><th>Section B</th><th>Day(s)</th><th>Time</th></tr>"
+
+def iter_clash_rows(rows):
+    for row in rows:
+        yield f"<tr class='{row['RowClass']}'><td>{row['Course A']}</td><td>{row['Section A']}</td><td>{row['Course B']}</td><td>{row['Section B']}</td><td>{row['Day(s)']}</td><td>{row['Time']}</td></tr>"
+
+RESOURCE_TITLES = {
+    "Instructor": "👩‍🏫 Instructor Double-Bookings",
+    "Room": "🏫 Room Double-Bookings",
+    "Cohort": "🎓 Cohort Conflicts",
+}
+
+def iter_resource_sections(resources):
+    # Extra report sections for the optional Instructor / Room / Cohort columns
+    for column, clashes in resources.items():
+        yield f"<h2>{RESOURCE_TITLES.get(column, column)}</h2>"
+        if clashes.empty:
+            yield "<p>No double-bookings found.</p>"
+            continue
+        yield f"<p class='violations'>🔴 {len(clashes)} Violations</p>"
+        yield (f"<table><tr><th>{column}</th><th>Course A</th><th>Section A</th><th>Course B</th>"
+               "<th>Section B</th><th>Day(s)</th><th>Time</th></tr>")
+        for row in clashes.to_dict('records'):
+            yield (f"<tr class='red-row'><td>{row[column]}</td><td>{row['Course A']}</td><td>{row['Section A']}</td>"
+                   f"<td>{row['Course B']}</td><td>{row['Section B']}</td><td>{row['Day(s)']}</td><td>{row['Time']}</td></tr>")
+        yield "</table>"
+
+SLOT_ICONS = {"free": "✅", "busy": "—", "locked": "🔒"}
+
+def slot_status(availability, locked, h, d):
+    # free / busy / locked for hour h on day d of one department's overview grid;
+    # locked holds the (day name, start, end) of blocked windows
+    s = FREE_SLOT_HOURS[h]
+    if (days_order[d], s, s + 60) in locked:
+        return "locked"
+    return "free" if availability is not None and availability[h, d] else "busy"
+
+def iter_free_slot_table(availability, blocked_windows):
+    # availability: bool array (FREE_SLOT_HOURS x days_order), or None for a
+    # department with no meetings
+    locked = {(day, start, end) for day, start, end, _ in blocked_windows}
+    yield "<table class='slots'><tr><th>Time</th>"
+    yield "".join(f"<th>{day}</th>" for day in days_order)
+    yield "</tr>"
+
+    for h, s in enumerate(FREE_SLOT_HOURS):
+        e = s + 60
+        cells = []
+        for d in range(len(days_order)):
+            status = slot_status(availability, locked, h, d)
+            cells.append(f"<td class='{status}'>{SLOT_ICONS[status]}</td>")
+        yield f"<tr><td>{format_minutes(s)}–{format_minutes(e)}</td>{''.join(cells)}</tr>"
+    yield "</table>"
+
+def iter_clash_report_html(result):
+    yield report_head("Course Clashes")
+    yield "<h1>Department-Wise Clash Report</h1>"
+
+    wednesday_by_dept = defaultdict(list)
+    for clash in result.wednesday_4_5:
+        wednesday_by_dept[clash["Department"]].append(clash)
+    clashes_by_dept = dict(tuple(result.clashes.groupby("Department", sort=False)))
+
+    for dept in result.departments:
+        yield f"<h2>{dept} Department</h2>"
+
+        # 📅 Free Slot Table with 🔒 Lock
+        yield "<h3>📆 Weekly Available Slot Overview (1-Hour Blocks)</h3>"
+        yield from iter_free_slot_table(result.availability.get(dept), result.blocked_windows)
+
+        # 🔴 Blocked-window (Wednesday 4–5 PM) restricted courses
+        for _, _, _, window in result.blocked_windows:
+            dept_wed_clashes = [c for c in wednesday_by_dept.get(dept, []) if c["Window"] == window]
+            if dept_wed_clashes:
+                yield f"<h3>⚠️ {window} Restricted Slot Courses</h3>"
+                yield f"<p class='violations'>🔴 {len(dept_wed_clashes)} Violations</p>"
+                yield "<table><tr><th>Course</th><th>Section</th><th>Day</th><th>Time</th></tr>"
+                for clash in dept_wed_clashes:
+                    yield f"<tr class='red-row'><td>{clash['Course']}</td><td>{clash['Section']}</td><td>{clash['Day']}</td><td>{clash['Time']}</td></tr>"
+                yield "</table>"
+
+        # 🔴🟢 Clash tables with violation counters
+        dept_group = clashes_by_dept.get(dept, result.clashes.iloc[:0])
+        for label, color in [('Non-Acceptable Clashes', 'red-row'), ('Acceptable Clashes', 'green-row')]:
+            section = dept_group[dept_group['RowClass'] == color]
+            yield f"<h3>{label}</h3>"
+            if not section.empty:
+                yield (f"<p class='{'violations' if color == 'red-row' else 'accepted'}'>"
+                       f"{'🔴' if color == 'red-row' else '🟢'} {len(section)} {'Violations' if color == 'red-row' else 'Accepted Clashes'}</p>")
+                yield CLASH_TABLE_HEADER
+                yield from iter_clash_rows(section.to_dict('records'))
+                yield "</table>"
+            else:
+                yield "<p>No clashes in this category.</p>"
+
+    # 👩‍🏫🏫🎓 Resource double-bookings cut across departments, so they follow them
+    yield from iter_resource_sections(result.resources)
+
+    yield "</body></html>"
+
+def iter_cross_report_html(result):
+    yield report_head("Cross-Department Clashes")
+    yield "<h1>Cross-Department Clashes</h1>"
+
+    grouped = result.clashes
+
+    # 🔴 CS–EE, EE–CPE, CS–CPE Clashes with red violation count
+    for pair in result.department_pairs:
+        section = grouped[grouped['DeptPair'] == pair]
+        yield f"<h2>{pair[0]} – {pair[1]} Same Level Clashes (300–700)</h2>"
+        if not section.empty:
+            yield f"<p class='violations'>🔴 {len(section)} Violations</p>"
+            yield CLASH_TABLE_HEADER
+            yield from iter_clash_rows(section.to_dict('records'))
+            yield "</table>"
+        else:
+            yield "<p>No clashes detected for this pair.</p>"
+
+    # 🔴 CSEE 480S / 481S vs All Departments (300-400)
+    yield f"<h2>{result.special_title}</h2>"
+    if result.csee_clashes:
+        yield f"<p class='violations'>🔴 {len(result.csee_clashes)} Violations</p>"
+        yield CLASH_TABLE_HEADER
+        yield from iter_clash_rows(result.csee_clashes)
+        yield "</table>"
+    else:
+        yield "<p>No such clashes found.</p>"
+
+    yield "</body></html>"
+
+DIFF_SECTION_TITLES = {
+    "department": "Department-Wise Clashes",
+    "blocked": "Restricted Slot Courses",
+    "instructor": RESOURCE_TITLES["Instructor"],
+    "room": RESOURCE_TITLES["Room"],
+    "cohort": RESOURCE_TITLES["Cohort"],
+    "cross": "Cross-Department Same Level Clashes",
+    "special": "Special Course Clashes",
+}
+DIFF_STATUS_ICONS = {"new": "🔴 New", "resolved": "🟢 Resolved", "unchanged": "⚪ Unchanged"}
+
+def iter_diff_report_html(diff):
+    yield report_head("Term Comparison")
+    yield f"<h1>Term Comparison: {diff.old_term} → {diff.new_term}</h1>"
+
+    counts = diff.counts
+    yield f"<p class='summary'>{' · '.join(f'{DIFF_STATUS_ICONS[s]}: {n}' for s, n in counts.items())}</p>"
+
+    # One table per kind of clash; the grouping keys are categorical, so kinds come in report order
+    for kind, section in diff.clashes.groupby('kind', observed=True, sort=True):
+        yield f"<h2>{DIFF_SECTION_TITLES.get(kind, kind)}</h2>"
+        yield ("<table><tr><th>Status</th><th>Scope</th><th>Course A</th><th>Section A</th><th>Course B</th>"
+               "<th>Section B</th><th>Day(s)</th><th>Time</th><th>Severity</th></tr>")
+        for row in section.to_dict('records'):
+            yield (f"<tr class='{row['status']}-row'><td>{DIFF_STATUS_ICONS[row['status']]}</td><td>{row['scope']}</td>"
+                   f"<td>{row['course_a']}</td><td>{row['section_a']}</td><td>{row['course_b']}</td>"
+                   f"<td>{row['section_b']}</td><td>{row['days']}</td><td>{row['time']}</td><td>{row['severity']}</td></tr>")
+        yield "</table>"
+
+    yield "</body></html>"
+
+@instrumented("render_report")
+def write_report(chunks, output):
+    # Stream rendered chunks to a file path or an already-open text buffer
+    if isinstance(output, (str, os.PathLike)):
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+    else:
+        output.writelines(chunks)
+    return output
+
+def render_report_bytes(chunks):
+    # In-memory variant for st.download_button
+    with stage("render_report"):
+        buffer = io.StringIO()
+        for chunk in chunks:
+            checkpoint()
+            buffer.write(chunk)
+        data = buffer.getvalue().encode("utf-8")
+        count(bytes=len(data))
+    return data
@@ -0,0 +1,75 @@
+"""Double-booked instructors, rooms and student cohorts."""
+from functools import lru_cache
+
+import numpy as np
+
+from .intervals import IntervalIndex
+
+# --------------------------
+# Resource Keys
+# --------------------------
+# A cell can name several resources ("Smith, J; Doe, A"), and exports fill the
+# column with placeholders for sections that have none yet. Keys are compared
+# case- and whitespace-insensitively.
+
+RESOURCE_SEPARATOR = ";"
+PLACEHOLDER_RESOURCES = {"", "TBA", "TBD", "STAFF", "ONLINE", "WEB", "ARRANGED", "NONE", "N/A"}
+
+@lru_cache(maxsize=None)
+def resource_keys(cell):
+    keys = {}
+    for part in str(cell).split(RESOURCE_SEPARATOR):
+        key = " ".join(part.split())
+        if key.upper() not in PLACEHOLDER_RESOURCES:
+            keys.setdefault(key.casefold(), key)
+    return tuple(keys.items())
+
+def build_resource_index(meetings, column):
+    # Hash index over one dimension: (resource key, day) -> that resource's meetings
+    # sorted by start, with meeting row numbers as ids. Distinct cells are split once.
+    values = meetings[column]
+    keys_by_code = [resource_keys(cell) for cell in values.cat.categories]
+    index = IntervalIndex()
+    for row, (code, day, start, end) in enumerate(zip(
+        values.cat.codes.tolist(), meetings['Day'].tolist(), meetings['StartMin'].tolist(), meetings['EndMin'].tolist(),
+    )):
+        if code >= 0:
+            for key, _ in keys_by_code[code]:
+                index.insert((key, day), start, end, row)
+    # Folded key -> the spelling shown in reports
+    labels = {key: label for keys in reversed(keys_by_code) for key, label in keys}
+    return index, labels
+
+# --------------------------
+# Conflict Sweep
+# --------------------------
+# Every (resource, day) bucket is swept once, so the cost follows the number of
+# meetings per resource instead of all pairs of sections. Pairs that are not real
+# double-bookings are dropped:
+#   - rows of the same section (a section listed twice);
+#   - same course title at the identical time: cross-listed or combined sections;
+#   - for cohorts, two sections of the same course, since students pick one.
+
+def resource_clash_pairs(meetings, column):
+    # (I, J, keys): meeting row pairs double-booking a resource of one dimension, with
+    # the resource each pair shares; one entry per resource, pair and day
+    index, labels = build_resource_index(meetings, column)
+    I, J, keys = [], [], []
+    for bucket in index.buckets:
+        for i, j in index.overlapping_pairs(bucket):
+            I.append(i)
+            J.append(j)
+            keys.append(labels[bucket[0]])
+    I, J = np.array(I, dtype=np.int64), np.array(J, dtype=np.int64)
+    keys = np.array(keys, dtype=object).reshape(-1)
+
+    course = meetings['Course'].cat.codes.to_numpy()
+    section = meetings['Section #'].cat.codes.to_numpy()
+    starts, ends = meetings['StartMin'].to_numpy(), meetings['EndMin'].to_numpy()
+    real = ~((course[I] == course[J]) & (section[I] == section[J]))
+    if 'Title' in meetings.columns:
+        title = meetings['Title'].cat.codes.to_numpy()
+        real &= ~((title[I] >= 0) & (title[I] == title[J]) & (starts[I] == starts[J]) & (ends[I] == ends[J]))
+    if column == 'Cohort':
+        real &= course[I] != course[J]
+    return I[real], J[real], keys[real]
@@ -0,0 +1,93 @@
+"""Declarative clash rules compiled into lookup tables."""
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .schedule import days_order, to_datetime_time_safe, to_minutes
+
+# --------------------------
+# Clash Rules
+# --------------------------
+# The clash policy lives in rules.json next to this module (or a YAML file with the
+# same keys) and is compiled once into lookup tables, so classifying a candidate pair
+# is a couple of array lookups instead of a chain of comparisons. Level groups are
+# level // 100.
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+LEVEL_GROUPS = 10
+
+@dataclass(frozen=True)
+class ClashRules:
+    department_index: dict           # dept -> row of level_pair_matrix; others use the last (default) row
+    level_pair_matrix: np.ndarray    # (n_depts + 1, 10, 10) bool, True = non-acceptable clash
+    cross_department_index: dict     # dept -> row/col of cross_pair_matrix; others use the last one
+    cross_pair_matrix: np.ndarray    # (n + 1, n + 1) int8, index into cross_pairs or -1
+    cross_pairs: tuple               # ((dept_a, dept_b), ...) in report order
+    cross_level_groups: np.ndarray   # (10,) bool, level groups checked across departments
+    special_key: str
+    special_title: str
+    special_courses: frozenset
+    special_min_level: int
+    special_max_level: int
+    blocked_windows: tuple           # ((day_code, start_min, end_min, label), ...)
+
+def level_pair_table(pairs):
+    table = np.zeros((LEVEL_GROUPS, LEVEL_GROUPS), dtype=bool)
+    for a, b in pairs:
+        table[a, b] = table[b, a] = True
+    return table
+
+def compile_rules(spec):
+    dept_specs = dict(spec.get("department_rules", {}))
+    default = dept_specs.pop("default", {"red_level_pairs": []})
+    department_index = {dept: k for k, dept in enumerate(dept_specs)}
+    level_pair_matrix = np.stack(
+        [level_pair_table(d["red_level_pairs"]) for d in dept_specs.values()] +
+        [level_pair_table(default["red_level_pairs"])]
+    )
+
+    cross = spec.get("cross_department_rules", {})
+    cross_pairs = tuple(tuple(pair) for pair in cross.get("department_pairs", []))
+    cross_departments = list(dict.fromkeys(d for pair in cross_pairs for d in pair))
+    cross_department_index = {dept: k for k, dept in enumerate(cross_departments)}
+    cross_pair_matrix = np.full((len(cross_departments) + 1,) * 2, -1, dtype=np.int8)
+    for k, (a, b) in enumerate(cross_pairs):
+        ia, ib = cross_department_index[a], cross_department_index[b]
+        cross_pair_matrix[ia, ib] = cross_pair_matrix[ib, ia] = k
+    cross_level_groups = np.zeros(LEVEL_GROUPS, dtype=bool)
+    cross_level_groups[cross.get("level_groups", [])] = True
+
+    special = spec.get("special_course_rule", {})
+    blocked_windows = tuple(
+        (days_order.index(w["day"]), to_minutes(to_datetime_time_safe(w["start"])),
+         to_minutes(to_datetime_time_safe(w["end"])), w.get("label", w["day"]))
+        for w in spec.get("blocked_windows", [])
+    )
+
+    return ClashRules(
+        department_index=department_index,
+        level_pair_matrix=level_pair_matrix,
+        cross_department_index=cross_department_index,
+        cross_pair_matrix=cross_pair_matrix,
+        cross_pairs=cross_pairs,
+        cross_level_groups=cross_level_groups,
+        special_key=special.get("key", "special"),
+        special_title=special.get("title", "Special Course Clashes"),
+        special_courses=frozenset(special.get("courses", [])),
+        special_min_level=special.get("min_level", 0),
+        special_max_level=special.get("max_level", -1),
+        blocked_windows=blocked_windows,
+    )
+
+@lru_cache(maxsize=8)
+def load_rules(path=DEFAULT_RULES_PATH):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # optional; only needed for YAML rule files
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    return compile_rules(spec)
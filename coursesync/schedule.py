@@ -0,0 +1,115 @@
+"""Meeting-pattern parsing and the compact normalized schedule table."""
+import re
+from datetime import datetime, time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .catalog import course_catalog
+from .instrument import count, instrumented
+
+# Constants
+days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+day_lookup = {'M': 'Monday', 'T': 'Tuesday', 'W': 'Wednesday', 'R': 'Thursday', 'F': 'Friday'}
+DAY_BITS = {code: 1 << days_order.index(day) for code, day in day_lookup.items()}
+DAY_NAMES = np.array(days_order, dtype=object)
+
+# Optional export columns carried into the sections table when present; each one is
+# a resource that cannot be in two places at once (see resources.py)
+RESOURCE_COLUMNS = ['Instructor', 'Room', 'Cohort']
+
+# --------------------------
+# Helpers
+# --------------------------
+
+def to_datetime_time_safe(time_str):
+    if pd.isna(time_str): return None
+    time_str = str(time_str).strip().lower().replace(" ", "")
+    for fmt in ['%I:%M%p', '%I%p']:
+        try:
+            return datetime.strptime(time_str, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+def to_minutes(t):
+    return t.hour * 60 + t.minute
+
+@lru_cache(maxsize=None)
+def minutes_to_time(minutes):
+    return time(*divmod(int(minutes), 60))
+
+@lru_cache(maxsize=None)
+def format_minutes(minutes):
+    return minutes_to_time(minutes).strftime('%I:%M %p')
+
+# --------------------------
+# Parsing and Normalization
+# --------------------------
+
+# Compiled once; str.extract runs it over the whole column in a single pass
+MEETING_PATTERN_RE = re.compile(
+    r"^\s*([MTWRF]+)\s+(\d{1,2}(?::\d{2})?[ap]m)-(\d{1,2}(?::\d{2})?[ap]m)", re.IGNORECASE
+)
+
+@instrumented("parse_meeting_patterns")
+def parse_meeting_patterns(patterns):
+    parsed = patterns.astype(str).str.extract(MEETING_PATTERN_RE)
+    parsed.columns = ['Days', 'Start Time', 'End Time']
+
+    # A term export only has a few dozen distinct time strings, so parse each once
+    # and broadcast the minutes-since-midnight back over the column
+    memo = {}
+    for time_str in pd.unique(pd.concat([parsed['Start Time'], parsed['End Time']]).dropna()):
+        t = to_datetime_time_safe(time_str)
+        memo[time_str] = to_minutes(t) if t is not None else None
+
+    parsed['StartMin'] = parsed['Start Time'].map(memo).astype('Int16')
+    parsed['EndMin'] = parsed['End Time'].map(memo).astype('Int16')
+    return parsed
+
+@instrumented("normalize_schedule")
+def normalize_schedule(df):
+    # Single normalization stage shared by every report. Produces one compact row per
+    # section: categorical course/section/department codes, a uint8 weekday bitmask
+    # and int16 minute offsets. The result is treated as read-only by the generators.
+    parsed = parse_meeting_patterns(df['Meeting Pattern'])
+    keep = (parsed['StartMin'].notna() & parsed['EndMin'].notna()).to_numpy()
+
+    day_masks = {days: sum(DAY_BITS.get(d, 0) for d in set(days)) for days in parsed['Days'].dropna().unique()}
+    sections = pd.DataFrame({
+        'Row': np.arange(len(df), dtype='int32'),
+        'Course': df['Course'].to_numpy(),
+        'Section #': df['Section #'].to_numpy(),
+        'DayMask': parsed['Days'].map(day_masks).to_numpy(),
+        'StartMin': parsed['StartMin'].to_numpy(),
+        'EndMin': parsed['EndMin'].to_numpy(),
+        'Time': (parsed['Start Time'] + '–' + parsed['End Time']).to_numpy(),
+        **{col: df[col].to_numpy() for col in RESOURCE_COLUMNS if col in df.columns},
+        **({'Title': df['Course Title'].to_numpy()} if 'Course Title' in df.columns else {}),
+    })[keep]
+
+    sections = sections.astype({
+        'Course': 'category', 'Section #': 'category', 'Time': 'category',
+        'DayMask': 'uint8', 'StartMin': 'int16', 'EndMin': 'int16',
+        **{col: 'category' for col in RESOURCE_COLUMNS + ['Title'] if col in sections.columns},
+    })
+    # Department and level come from the course catalog, parsed once per distinct course
+    catalog = course_catalog(sections['Course'].cat.categories)
+    course_ids = sections['Course'].cat.codes.to_numpy()
+    sections['Department'] = pd.Series(catalog.department[course_ids], index=sections.index).astype('category')
+    level = catalog.level[course_ids]
+    sections['Level'] = pd.arrays.IntegerArray(level, level < 0)
+    sections = sections[sections['DayMask'] != 0].reset_index(drop=True)
+    count(rows=len(df), sections=len(sections))
+    return sections
+
+def expand_meetings(sections):
+    # One row per (section, weekday), expanded from the DayMask bits in a single
+    # NumPy pass; rows stay in upload order, then weekday order
+    bits = (sections['DayMask'].to_numpy()[:, None] >> np.arange(len(days_order))) & 1
+    rows, days = np.nonzero(bits)
+    meetings = sections.iloc[rows].reset_index(drop=True)
+    meetings['Day'] = days.astype('int8')
+    return meetings
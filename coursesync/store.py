@@ -0,0 +1,158 @@
+"""Persistent SQLite store of analyzed terms and term-to-term clash diffs."""
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .export import CLASH_COLUMNS, clash_rows
+from .schedule import RESOURCE_COLUMNS
+
+DEFAULT_STORE_PATH = "coursesync.db"
+
+# --------------------------
+# Schema
+# --------------------------
+# One row per normalized section and one per reported clash, both tagged with the
+# term (any label: "Fall 2025", "Fall 2025 draft 2"). Every clash carries a
+# clash_key that names it independently of upload order, so two terms compare by
+# an indexed lookup on (term, clash_key) instead of re-running either analysis.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    source TEXT,
+    file_hash TEXT,
+    saved_at TEXT,
+    sections INTEGER
+);
+CREATE TABLE IF NOT EXISTS sections (
+    term TEXT NOT NULL,
+    row INTEGER,
+    course TEXT,
+    section TEXT,
+    department TEXT,
+    level INTEGER,
+    day_mask INTEGER,
+    start_min INTEGER,
+    end_min INTEGER,
+    time TEXT,
+    instructor TEXT,
+    room TEXT,
+    cohort TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS sections_term_dept_course ON sections (term, department, course);
+CREATE TABLE IF NOT EXISTS clashes (
+    term TEXT NOT NULL,
+    clash_key TEXT NOT NULL,
+    kind TEXT,
+    scope TEXT,
+    severity TEXT,
+    course_a TEXT,
+    section_a TEXT,
+    course_b TEXT,
+    section_b TEXT,
+    days TEXT,
+    time TEXT
+);
+CREATE INDEX IF NOT EXISTS clashes_term_key ON clashes (term, clash_key);
+CREATE INDEX IF NOT EXISTS clashes_term_kind ON clashes (term, kind, scope);
+CREATE INDEX IF NOT EXISTS clashes_term_course ON clashes (term, course_a, course_b);
+"""
+
+# normalize_schedule's column order -> store column
+SECTION_COLUMNS = {
+    'Row': 'row', 'Course': 'course', 'Section #': 'section', 'DayMask': 'day_mask', 'StartMin': 'start_min',
+    'EndMin': 'end_min', 'Time': 'time', 'Instructor': 'instructor', 'Room': 'room', 'Cohort': 'cohort',
+    'Title': 'title', 'Department': 'department', 'Level': 'level',
+}
+
+def open_store(path=DEFAULT_STORE_PATH):
+    # Batch runs may write several terms from separate processes; wait for the lock
+    connection = sqlite3.connect(path, timeout=30)
+    connection.executescript(SCHEMA)
+    return connection
+
+def list_terms(connection):
+    return pd.read_sql_query("SELECT term, source, saved_at, sections FROM terms ORDER BY saved_at", connection)
+
+# --------------------------
+# Saving a Term
+# --------------------------
+
+def save_term(connection, term, sections, clash_result, cross_result, source="", file_hash=""):
+    # Replaces whatever was stored under `term` in one transaction
+    columns = [col for col in SECTION_COLUMNS if col in sections.columns]
+    values = sections[columns].astype(object)
+    values = values.where(values.notna(), None)
+    with connection:
+        for table in ("terms", "sections", "clashes"):
+            connection.execute(f"DELETE FROM {table} WHERE term = ?", (term,))
+        connection.execute(
+            "INSERT INTO terms VALUES (?, ?, ?, ?, ?)",
+            (term, source, file_hash, datetime.now(timezone.utc).isoformat(timespec="seconds"), len(sections)),
+        )
+        connection.executemany(
+            f"INSERT INTO sections (term, {', '.join(SECTION_COLUMNS[col] for col in columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+            ((term, *row) for row in values.itertuples(index=False, name=None)),
+        )
+        connection.executemany(
+            f"INSERT INTO clashes (term, clash_key, {', '.join(CLASH_COLUMNS)}) VALUES ({', '.join('?' * 11)})",
+            ((term, *row) for row in clash_rows(clash_result, cross_result)),
+        )
+
+def load_sections(connection, term):
+    # The normalized sections table of a stored term, dtypes as normalize_schedule makes them
+    names = {v: k for k, v in SECTION_COLUMNS.items()}
+    df = pd.read_sql_query("SELECT * FROM sections WHERE term = ? ORDER BY row", connection, params=(term,))
+    df = df.drop(columns="term").rename(columns=names)
+    # Optional columns the stored upload did not have come back all-NULL
+    optional = RESOURCE_COLUMNS + ['Title']
+    df = df[[col for col in SECTION_COLUMNS if col not in optional or df[col].notna().any()]]
+    return df.astype({
+        'Row': 'int32', 'Course': 'category', 'Section #': 'category', 'Time': 'category',
+        'DayMask': 'uint8', 'StartMin': 'int16', 'EndMin': 'int16', 'Department': 'category', 'Level': 'Int16',
+        **{col: 'category' for col in optional if col in df.columns},
+    })
+
+# --------------------------
+# Term Diff
+# --------------------------
+
+DIFF_QUERY = f"""
+SELECT 'new' AS status, {', '.join('b.' + c for c in CLASH_COLUMNS)} FROM clashes b
+ WHERE b.term = :new AND NOT EXISTS (SELECT 1 FROM clashes a WHERE a.term = :old AND a.clash_key = b.clash_key)
+UNION ALL
+SELECT 'resolved', {', '.join('a.' + c for c in CLASH_COLUMNS)} FROM clashes a
+ WHERE a.term = :old AND NOT EXISTS (SELECT 1 FROM clashes b WHERE b.term = :new AND b.clash_key = a.clash_key)
+UNION ALL
+SELECT 'unchanged', {', '.join('b.' + c for c in CLASH_COLUMNS)} FROM clashes b
+ WHERE b.term = :new AND EXISTS (SELECT 1 FROM clashes a WHERE a.term = :old AND a.clash_key = b.clash_key)
+"""
+
+KIND_ORDER = ["department", "blocked", "instructor", "room", "cohort", "cross", "special"]
+STATUS_ORDER = ["new", "resolved", "unchanged"]
+
+@dataclass
+class TermDiff:
+    old_term: str
+    new_term: str
+    clashes: pd.DataFrame        # status (new/resolved/unchanged) + CLASH_COLUMNS, new term's wording
+
+    @property
+    def counts(self):
+        return {status: int((self.clashes['status'] == status).sum()) for status in STATUS_ORDER}
+
+def diff_terms(connection, old_term, new_term):
+    stored = set(list_terms(connection)['term'])
+    missing = [term for term in (old_term, new_term) if term not in stored]
+    if missing:
+        raise KeyError(f"term(s) not in the store: {', '.join(missing)}")
+    df = pd.read_sql_query(DIFF_QUERY, connection, params={"old": old_term, "new": new_term})
+    df = df.fillna({'course_b': "", 'section_b': ""})   # blocked-window entries have no B side
+    df['status'] = pd.Categorical(df['status'], categories=STATUS_ORDER, ordered=True)
+    df['kind'] = pd.Categorical(df['kind'], categories=KIND_ORDER, ordered=True)
+    df = df.sort_values(['kind', 'scope', 'status', 'course_a', 'section_a'], kind='stable', ignore_index=True)
+    return TermDiff(old_term=old_term, new_term=new_term, clashes=df)
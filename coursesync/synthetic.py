@@ -0,0 +1,86 @@
+"""Seeded synthetic term schedules for benchmarks and demos."""
+import random
+from itertools import product
+from string import ascii_uppercase
+
+import pandas as pd
+
+# --------------------------
+# Meeting Pattern Catalog
+# --------------------------
+# Standard registrar blocks: 50-minute MWF classes on the hour, 75-minute TR and
+# MW classes, and single-day evening and lab blocks. Weights roughly follow a
+# typical term export.
+
+MWF_SLOTS = [("8am", "8:50am"), ("9am", "9:50am"), ("10am", "10:50am"), ("11am", "11:50am"),
+             ("12pm", "1:10pm"), ("1pm", "1:50pm"), ("2pm", "2:50pm"), ("3pm", "3:50pm"), ("4pm", "4:50pm")]
+LONG_SLOTS = [("8:30am", "9:45am"), ("10am", "11:15am"), ("11:30am", "12:45pm"), ("1pm", "2:15pm"),
+              ("2:30pm", "3:45pm"), ("4pm", "5:15pm"), ("5:30pm", "6:45pm")]
+EVENING_SLOTS = [("6pm", "8:30pm"), ("7pm", "9:50pm"), ("2pm", "4:50pm")]
+
+PATTERNS = [
+    ("MWF", MWF_SLOTS, 40),
+    ("TR", LONG_SLOTS, 30),
+    ("MW", LONG_SLOTS, 12),
+    ("M", EVENING_SLOTS, 3), ("T", EVENING_SLOTS, 3), ("W", EVENING_SLOTS, 3),
+    ("R", EVENING_SLOTS, 3), ("F", EVENING_SLOTS, 2),
+    ("MTWRF", MWF_SLOTS[:4], 1),
+]
+
+BASE_DEPARTMENTS = ["CS", "EE", "CPE", "CSEE", "MAE", "CHE", "CE", "IENG", "MATH", "STAT", "PHYS", "CHEM", "BIOL", "ECON"]
+LEVEL_WEIGHTS = {100: 24, 200: 22, 300: 18, 400: 14, 500: 10, 600: 7, 700: 5}
+SECTIONS_PER_DEPARTMENT = 40    # typical department size at density 1.0
+UNSCHEDULED_SHARE = 0.04        # online/TBA rows without a meeting pattern
+
+def department_codes(n):
+    # The real codes first, then synthetic four-letter ones (AAAB, AAAC, ...)
+    codes = BASE_DEPARTMENTS[:n]
+    for letters in product(ascii_uppercase, repeat=4):
+        if len(codes) >= n:
+            break
+        code = "".join(letters)
+        if code not in BASE_DEPARTMENTS and len(set(letters)) > 1:
+            codes.append(code)
+    return codes
+
+def generate_schedule(n_sections, seed=0, density=1.0, departments=None):
+    # Upload-shaped DataFrame (Course, Section #, Course Title, Meeting Pattern) with
+    # n_sections rows. density scales how many sections share one department, and
+    # so how crowded each department's time grid is.
+    rng = random.Random(seed)
+    if departments is None:
+        n_departments = max(1, round(n_sections / (SECTIONS_PER_DEPARTMENT * density)))
+        departments = department_codes(min(max(n_departments, 4), n_sections))
+    levels, level_weights = zip(*LEVEL_WEIGHTS.items())
+    pattern_weights = [weight for _, _, weight in PATTERNS]
+
+    rows = []
+    catalog = {dept: [] for dept in departments}
+    section_counts = {}
+    while len(rows) < n_sections:
+        dept = rng.choice(departments)
+        if catalog[dept] and rng.random() < 0.35:
+            # Another section of an existing course
+            course = rng.choice(catalog[dept])
+        else:
+            level = rng.choices(levels, level_weights)[0] + rng.randrange(100)
+            suffix = rng.choices(["", "S", "L"], [85, 8, 7])[0]
+            course = f"{dept} {level}{suffix}"
+            if dept == "CSEE" and rng.random() < 0.05:
+                course = rng.choice(["CSEE 480S", "CSEE 481S"])
+            catalog[dept].append(course)
+        section_counts[course] = section_no = section_counts.get(course, 0) + 1
+
+        if rng.random() < UNSCHEDULED_SHARE:
+            pattern = rng.choice(["TBA", None])
+        else:
+            days, slots, _ = rng.choices(PATTERNS, pattern_weights)[0]
+            start, end = rng.choice(slots)
+            pattern = f"{days} {start}-{end}"
+        rows.append({
+            "Course": course,
+            "Section #": f"{section_no:03d}",
+            "Course Title": f"{course} Topics",
+            "Meeting Pattern": pattern,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,103 @@
+"""What-if slot finder: where could one section move without a red clash?"""
+import numpy as np
+import pandas as pd
+
+from .schedule import DAY_BITS, days_order, format_minutes
+
+# --------------------------
+# Pair Classification
+# --------------------------
+# The same policy the reports apply, for one moved section against one meeting:
+# "red" blocks the placement, "green" is an acceptable clash, None is no clash.
+
+def pair_severity(rules, a, b):
+    if a.level < 0 or b.level < 0:
+        return None
+    low, high = rules.special_min_level, rules.special_max_level
+    if (a.special and low <= b.level <= high) or (b.special and low <= a.level <= high):
+        return "red"
+    if a.dept == b.dept:
+        level_matrix = rules.level_pair_matrix[rules.department_index.get(a.dept, -1)]
+        return "red" if level_matrix[a.level // 100, b.level // 100] else "green"
+    ia = rules.cross_department_index.get(a.dept, -1)
+    ib = rules.cross_department_index.get(b.dept, -1)
+    group = a.level // 100
+    if rules.cross_pair_matrix[ia, ib] >= 0 and group == b.level // 100 and rules.cross_level_groups[group]:
+        return "red"
+    return None
+
+def day_pattern_label(day_mask):
+    return "".join(code for code, bit in DAY_BITS.items() if day_mask & bit)
+
+# --------------------------
+# Slot Finder
+# --------------------------
+
+def find_section_slots(state, course, section, occurrence=0, day_masks=None,
+                       earliest=8 * 60, latest=22 * 60, step=15):
+    # Every (days, start, end) placement of the section that keeps its length and
+    # creates no red clash and no blocked-window (Wednesday 4–5 PM) meeting, ranked
+    # by how many sections it would clash with acceptably. Candidates are checked
+    # against the ClashState interval index built for the current schedule.
+    rules = state.rules
+    sid = state.ids.get((course, section, occurrence))
+    if sid is None:
+        raise KeyError(f"{course} {section} is not in the current schedule")
+    moved = state.records[sid]
+    duration = moved.end - moved.start
+    starts = np.arange(earliest, latest - duration + 1, step)
+    if day_masks is None:
+        # Patterns the department already uses (MWF, TR, ...), plus the section's own
+        day_masks = {state.records[other].day_mask for other in state.members.get(moved.dept, ())}
+    day_masks = sorted(set(day_masks) | {moved.day_mask}, key=lambda m: (-bin(m).count("1"), -m))
+
+    # Pull every meeting in the search window that the rules pair with this section
+    departments = list(state.members)
+    red = {d: np.zeros(len(starts), dtype=bool) for d in range(len(days_order))}
+    green = {}
+    for day in range(len(days_order)):
+        others, bounds = [], []
+        for dept in departments:
+            for other in state.index.overlapping((dept, day), earliest, latest):
+                severity = other != sid and pair_severity(rules, moved, state.records[other])
+                if severity == "red":
+                    o = state.records[other]
+                    red[day] |= (o.start < starts + duration) & (o.end > starts)
+                elif severity == "green":
+                    others.append(other)
+                    bounds.append((state.records[other].start, state.records[other].end))
+        for window_day, start, end, _ in rules.blocked_windows:
+            if window_day == day:
+                red[day] |= (starts < end) & (starts + duration > start)
+        bounds = np.array(bounds, dtype=np.int64).reshape(-1, 2)
+        overlap = (bounds[:, :1] < starts + duration) & (bounds[:, 1:] > starts)
+        green[day] = (np.array(others, dtype=np.int64), overlap)
+
+    rows = []
+    for mask in day_masks:
+        days = [d for d in range(len(days_order)) if mask >> d & 1]
+        blocked = np.zeros(len(starts), dtype=bool)
+        for d in days:
+            blocked |= red[d]
+        # Acceptable clashes count each other section once, however many days it meets
+        sids = np.concatenate([green[d][0] for d in days])
+        overlap = np.concatenate([green[d][1] for d in days])
+        _, codes = np.unique(sids, return_inverse=True)
+        per_section = np.zeros((codes.max() + 1 if len(codes) else 0, len(starts)), dtype=np.int32)
+        np.add.at(per_section, codes, overlap)
+        acceptable = (per_section > 0).sum(axis=0)
+        for k in np.flatnonzero(~blocked):
+            start = int(starts[k])
+            rows.append({
+                "Days": day_pattern_label(mask),
+                "Time": f"{format_minutes(start)}–{format_minutes(start + duration)}",
+                "StartMin": start,
+                "EndMin": start + duration,
+                "DayMask": mask,
+                "Acceptable Clashes": int(acceptable[k]),
+                "Current": mask == moved.day_mask and start == moved.start,
+            })
+
+    columns = ["Days", "Time", "StartMin", "EndMin", "DayMask", "Acceptable Clashes", "Current"]
+    slots = pd.DataFrame(rows, columns=columns)
+    return slots.sort_values(["Acceptable Clashes", "StartMin"], kind="stable").reset_index(drop=True)
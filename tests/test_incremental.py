@@ -0,0 +1,55 @@
+"""Incremental re-analysis must report exactly what a full run reports."""
+import random
+
+import pandas as pd
+import pytest
+
+from coursesync import generate_clash_report, normalize_schedule
+from coursesync.incremental import build_clash_state, update_clash_state
+from coursesync.render import iter_clash_report_html, render_report_bytes
+from coursesync.synthetic import generate_schedule
+
+# Patterns beyond the synthetic catalog: the blocked window, TBA, and meetings that
+# end at or before their start
+PATTERNS = ["MWF 9am-9:50am", "TR 11am-12:15pm", "W 4pm-4:50pm", "MW 2pm-3:15pm", "F 7pm-9:50pm",
+            "TBA", "MTWRF 1pm-1:50pm", "R 6pm-8:30pm", "M 3pm-1pm", "T 8pm-8pm"]
+
+def edit(df, rng):
+    # One random re-upload: changed patterns, dropped, added or renamed sections, or a shuffle
+    df = df.copy()
+    op = rng.random()
+    for _ in range(rng.randint(1, 6)):
+        i = df.index[rng.randrange(len(df))]
+        if op < 0.4:
+            df.loc[i, 'Meeting Pattern'] = rng.choice(PATTERNS)
+        elif op < 0.55:
+            df = df.drop(i)
+        elif op < 0.7:
+            df = pd.concat([df, generate_schedule(1, seed=rng.randrange(1000))], ignore_index=True)
+        elif op < 0.8:
+            return df.sample(frac=1, random_state=rng.randrange(100)).reset_index(drop=True)
+        elif op < 0.9:
+            df.loc[i, 'Course'] = rng.choice(["CS 350", "EE 410", "NEW 300", "CPE 271"])
+        else:
+            df.loc[i, 'Section #'] = "009"
+    return df
+
+def assert_same_report(incremental, full):
+    assert incremental.departments == full.departments
+    assert incremental.counts == full.counts
+    assert incremental.wednesday_4_5 == full.wednesday_4_5
+    assert incremental.free_slots == full.free_slots
+    assert (render_report_bytes(iter_clash_report_html(incremental))
+            == render_report_bytes(iter_clash_report_html(full)))
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_matches_full_run(seed):
+    rng = random.Random(seed)
+    df = generate_schedule(rng.choice([50, 200, 400]), seed=seed, density=2.0)
+    state = build_clash_state(normalize_schedule(df))
+    assert_same_report(state.result, generate_clash_report(normalize_schedule(df)))
+    for _ in range(6):
+        df = edit(df, rng)
+        sections = normalize_schedule(df)
+        state = update_clash_state(state, sections)
+        assert_same_report(state.result, generate_clash_report(sections))
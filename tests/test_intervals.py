@@ -0,0 +1,68 @@
+"""Sweep-line overlap detection against a brute-force O(n²) check."""
+import random
+from itertools import combinations
+
+import pytest
+
+from coursesync.intervals import IntervalIndex, find_overlapping_pairs, find_overlapping_pairs_between
+
+def overlaps(days, starts, ends, i, j):
+    # Half-open [start, end) on the same day; empty or inverted meetings never overlap
+    return (days[i] == days[j] and starts[i] < ends[i] and starts[j] < ends[j]
+            and max(starts[i], starts[j]) < min(ends[i], ends[j]))
+
+def random_meetings(rng, n):
+    # Coarse 15-minute grid, so touching endpoints, identical meetings and
+    # zero-length or inverted meetings all come up often
+    days = [rng.randrange(3) for _ in range(n)]
+    starts = [rng.randrange(0, 12) * 15 for _ in range(n)]
+    ends = [start + rng.choice([-15, 0, 15, 30, 45, 60, 120]) for start in starts]
+    for k in rng.sample(range(n), n // 5):
+        copy = rng.randrange(n)
+        days[k], starts[k], ends[k] = days[copy], starts[copy], ends[copy]
+    return days, starts, ends
+
+@pytest.mark.parametrize("seed", range(50))
+def test_find_overlapping_pairs(seed):
+    rng = random.Random(seed)
+    days, starts, ends = random_meetings(rng, rng.randrange(0, 60))
+    expected = [(i, j) for i, j in combinations(range(len(days)), 2) if overlaps(days, starts, ends, i, j)]
+    assert find_overlapping_pairs(days, starts, ends) == expected
+
+@pytest.mark.parametrize("seed", range(50))
+def test_find_overlapping_pairs_between(seed):
+    rng = random.Random(seed)
+    days, starts, ends = random_meetings(rng, rng.randrange(0, 60))
+    # A meeting can sit on either side, both, or neither
+    left = [rng.random() < 0.5 for _ in days]
+    right = [rng.random() < 0.5 for _ in days]
+    expected = [
+        (i, j) for i, j in combinations(range(len(days)), 2)
+        if overlaps(days, starts, ends, i, j) and ((left[i] and right[j]) or (right[i] and left[j]))
+    ]
+    assert find_overlapping_pairs_between(days, starts, ends, left, right) == expected
+
+@pytest.mark.parametrize("seed", range(50))
+def test_interval_index(seed):
+    rng = random.Random(seed)
+    days, starts, ends = random_meetings(rng, rng.randrange(1, 60))
+    index = IntervalIndex()
+    stored = set()
+    for k in range(len(days)):
+        index.insert(days[k], starts[k], ends[k], k)
+        stored.add(k)
+        if rng.random() < 0.3:
+            gone = rng.choice(sorted(stored))
+            index.remove(days[gone], starts[gone], ends[gone], gone)
+            stored.discard(gone)
+
+    for _ in range(20):
+        day, start = rng.randrange(3), rng.randrange(0, 12) * 15
+        end = start + rng.choice([-15, 0, 15, 60])
+        expected = {k for k in stored if overlaps(days + [day], starts + [start], ends + [end], k, len(days))}
+        assert set(index.overlapping(day, start, end)) == expected
+
+    for day in range(3):
+        expected = [(i, j) for i, j in combinations(sorted(stored), 2)
+                    if days[i] == day and overlaps(days, starts, ends, i, j)]
+        assert sorted(index.overlapping_pairs(day)) == expected